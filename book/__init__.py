@@ -0,0 +1 @@
+from .probe import OpeningBook
@@ -0,0 +1,114 @@
+"""
+Builds the opening book offline:
+
+    python -m book.builder --plies 4 --depth 8 --output opening.book --workers 4
+"""
+
+import argparse
+import os
+import time
+from multiprocessing import Pool
+from checkers.constants import RED, WHITE
+from checkers.bitboard import BitBoard
+from checkers.zobrist import position_key
+from minimax.algorithm import _alpha_beta
+from minimax.ordering import MoveOrdering
+from minimax.transposition import TranspositionTable
+from .probe import HEADER, RECORD, MAGIC, VERSION, SCORE_SCALE
+
+MAX_WEIGHT = 1000
+
+# per worker process state, set by _init_worker
+_table = None
+_ordering = None
+
+def _init_worker(table_bytes):
+    global _table, _ordering
+    _table = TranspositionTable(table_bytes)
+    _ordering = MoveOrdering()
+
+def _score_moves(task):
+    # scores of every move of a position, each searched with the full window
+    masks, color, depth = task
+    position = BitBoard(*masks)
+    max_player = color == WHITE
+    scores = []
+    for move in position.get_all_moves(color):
+        position.make_move(move)
+        value = _alpha_beta(position, depth - 1, float('-inf'), float('inf'), not max_player, _table, 1,
+                            ordering=_ordering)[0]
+        position.unmake_move(move)
+        scores.append((move, value))
+    return masks, color, scores
+
+def book_moves(scores, max_player, margin):
+    """[(move, weight, score)] of the moves within `margin` of the best one."""
+    if not scores:
+        return []
+    best = max(value for _, value in scores) if max_player else min(value for _, value in scores)
+    kept = []
+    for move, value in scores:
+        loss = best - value if max_player else value - best
+        if loss <= margin:
+            weight = MAX_WEIGHT if margin == 0 else max(1, round(MAX_WEIGHT * (1 - loss / margin)))
+            kept.append((move, weight, value))
+    return kept
+
+def build(output, plies=4, depth=8, margin=0.3, workers=None, table_bytes=32 * 1024 * 1024):
+    """
+    Searches the opening tree and writes the book to `output`.
+
+    Args:
+    - plies: depth of the opening tree, the positions after `plies` moves are not in the book.
+    - depth: search depth of every book move.
+    - margin: score distance from the best move still played.
+
+    Returns:
+    - number of positions in the book.
+    """
+    records = []
+    level = {(BitBoard.initial().white, BitBoard.initial().red, 0): RED}
+    seen = set()
+    with Pool(workers, _init_worker, (table_bytes,)) as pool:
+        for ply in range(plies):
+            start = time.perf_counter()
+            tasks = [(masks, color, depth) for masks, color in level.items()]
+            following = {}
+            for masks, color, scores in pool.imap_unordered(_score_moves, tasks):
+                position = BitBoard(*masks)
+                key = position_key(position, color == WHITE)
+                for move, weight, value in book_moves(scores, color == WHITE, margin):
+                    records.append((key, move[0], move[1], weight, round(value * SCORE_SCALE)))
+                #every reply is followed, the opponent is not bound to the book
+                opponent = WHITE if color == RED else RED
+                for move, _ in scores:
+                    child = position.apply(move)
+                    child_key = position_key(child, opponent == WHITE)
+                    if child_key not in seen and child.winner() is None:
+                        seen.add(child_key)
+                        following[(child.white, child.red, child.kings)] = opponent
+            print("ply %d: %d positions, %.1f s" % (ply, len(level), time.perf_counter() - start))
+            level = following
+
+    records.sort()
+    partial_path = output + '.part'
+    with open(partial_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        for record in records:
+            file.write(RECORD.pack(*record))
+    os.replace(partial_path, output)
+    return len({record[0] for record in records})
+
+def main():
+    parser = argparse.ArgumentParser(description="Builds the opening book.")
+    parser.add_argument('--plies', type=int, default=4, help="depth of the opening tree")
+    parser.add_argument('--depth', type=int, default=8, help="search depth of every move")
+    parser.add_argument('--margin', type=float, default=0.3, help="score distance from the best move still played")
+    parser.add_argument('--output', default='opening.book')
+    parser.add_argument('--workers', type=int, default=None, help="processes, one per CPU by default")
+    args = parser.parse_args()
+    positions = build(args.output, args.plies, args.depth, args.margin, args.workers)
+    print("%d positions in %s" % (positions, args.output))
+
+if __name__ == '__main__':
+    main()
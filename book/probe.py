@@ -0,0 +1,99 @@
+"""Reading the opening book written by book.builder, memory mapped and bisected on the position keys."""
+
+import mmap
+import struct
+from checkers.constants import WHITE
+from checkers.notation import move_squares
+from checkers.zobrist import position_key
+
+MAGIC = b'CKBK'
+VERSION = 1
+HEADER = struct.Struct('<4sB3xQ')       # magic, version, number of records
+# one record per book move, sorted by key: position_key, origin square, landing square, weight, score * SCORE_SCALE
+RECORD = struct.Struct('<QBBHi')
+KEY = struct.Struct('<Q')
+SCORE_SCALE = 100
+
+class OpeningBook:
+    """
+    Book moves of the positions in the file at `path`.
+
+    Args:
+    - path: file written by book.builder.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION or len(self.data) != HEADER.size + self.count * RECORD.size:
+            self.data.close()
+            raise ValueError("%s is not an opening book" % path)
+
+    def __len__(self):
+        return self.count
+
+    def _first(self, key):
+        # first record whose key is not below `key`
+        data, low, high = self.data, 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if KEY.unpack_from(data, HEADER.size + middle * RECORD.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def entries(self, position, color):
+        """[(origin, destination, weight, score)] of `position` (Board or BitBoard) with `color` to move, [] if not in the book."""
+        key = position_key(position, color == WHITE)
+        found = []
+        at = self._first(key)
+        while at < self.count:
+            entry_key, origin, destination, weight, score = RECORD.unpack_from(self.data, HEADER.size + at * RECORD.size)
+            if entry_key != key:
+                break
+            found.append((origin, destination, weight, score / SCORE_SCALE))
+            at += 1
+        return found
+
+    def moves(self, position, color):
+        """[(move, weight, score)] of the book moves that are legal in `position`, heaviest first."""
+        entries = self.entries(position, color)
+        if not entries:
+            return []
+        legal = {move_squares(move): move for move in position.get_all_moves(color)}
+        found = []
+        for origin, destination, weight, score in entries:
+            #a legal move also rules out another position with the same key
+            move = legal.get((origin, destination))
+            if move is not None:
+                found.append((move, weight, score))
+        found.sort(key=lambda entry: -entry[1])
+        return found
+
+    def choose(self, position, color, rng=None):
+        """
+        A book move of `position`, None when it is not in the book.
+
+        Args:
+        - rng: random.Random to pick moves in proportion to their weight, None for the heaviest.
+
+        Returns:
+        - (move, score)
+        """
+        moves = self.moves(position, color)
+        if not moves:
+            return None
+        if rng is None:
+            move, _, score = moves[0]
+            return move, score
+        pick = rng.uniform(0, sum(weight for _, weight, _ in moves))
+        for move, weight, score in moves:
+            pick -= weight
+            if pick <= 0:
+                break
+        return move, score
+
+    def close(self):
+        self.data.close()
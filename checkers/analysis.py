@@ -0,0 +1,89 @@
+"""Legal moves and game over status of one position, computed once and shared by the search, the evaluation and Game."""
+
+from .constants import RED, WHITE
+
+class Analysis:
+    """
+    Legal moves, mobility per side and game over status of `position`, each part computed on first use.
+
+    The position must not change while the analysis is in use, take it from position.analysis()
+    again after a move.
+
+    Args:
+    - position: Board or BitBoard.
+    - key: what the position's analysis() checks to know the analysis is still its own, if anything.
+    """
+    __slots__ = ('position', 'key', '_moves', '_captures', '_terms', '_movable', '_winner', '_winner_known')
+
+    def __init__(self, position, key=None):
+        self.position = position
+        self.key = key
+        self._moves = {}
+        self._captures = {}
+        self._terms = {}
+        self._movable = None
+        self._winner = None
+        self._winner_known = False
+
+    def moves(self, color):
+        """get_all_moves(color), a new list on every call: the caller may reorder it."""
+        return list(self._legal(color))
+
+    def captures(self, color):
+        """get_captures(color), a new list on every call."""
+        captures = self._captures.get(color)
+        if captures is None:
+            captures = self._captures[color] = self.position.get_captures(color)
+        return list(captures)
+
+    def has_moves(self, color):
+        return bool(self._legal(color))
+
+    def mobility(self, color):
+        """Number of legal moves of `color`."""
+        return len(self._legal(color))
+
+    def _legal(self, color):
+        moves = self._moves.get(color)
+        if moves is None:
+            moves = self._moves[color] = self.position.get_all_moves(color)
+        return moves
+
+    def term(self, name, compute):
+        """compute(position), once per position: the masks shared by the BitBoard evaluations (checkers/features.py TERMS)."""
+        value = self._terms.get(name)
+        if value is None:
+            value = self._terms[name] = compute(self.position)
+        return value
+
+    def movable(self, color):
+        """Pieces of `color` that Board.is_movable accepts, the mobility evaluate_22F scores."""
+        if self._movable is None:
+            self._movable = self.position.movable_counts()
+        return self._movable[0] if color == WHITE else self._movable[1]
+
+    def is_winner(self, color):
+        """Board.is_winner: no piece of the other color can move."""
+        return self.movable(RED if color == WHITE else WHITE) == 0
+
+    def winner(self):
+        """position.winner(): the color left alone on the board, None while both have pieces (the search stops there)."""
+        if not self._winner_known:
+            self._winner = self.position.winner()
+            self._winner_known = True
+        return self._winner
+
+    def game_over(self, color):
+        """
+        Winner with `color` to move, None while the game goes on.
+
+        RED wins first when neither side can move any piece (Board.is_winner, as the game loop checks
+        it), and a side to move without a legal move loses.
+        """
+        if self.is_winner(RED):
+            return RED
+        if self.is_winner(WHITE):
+            return WHITE
+        if not self.has_moves(color):
+            return WHITE if color == RED else RED
+        return None
@@ -0,0 +1,152 @@
+"""evaluate_22F of many positions at once with NumPy, the same score as Board.evaluate_22F."""
+
+import numpy as np
+from .bitboard import BitBoard, NEIGHBORS, SQUARES, UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT, EDGE, CENTRAL, \
+    MAIN_DIAGONAL, DOUBLE_DIAGONAL, WHITE_DEFENDER_ROWS, RED_DEFENDER_ROWS, square_of, row_col
+from .constants import ROWS, WHITE
+from .evaluation import score_22F, WEIGHTS_22F
+
+# positions are rows of 32 of these codes, square s is cell s+1 of the diagram in board.py
+EMPTY, WHITE_PAWN, WHITE_KING, RED_PAWN, RED_KING = 0, 1, 2, -1, -2
+OFF_BOARD = 9   # value of the padding column that the off board neighbors point to
+
+# neighbor lookups: _NEIGHBORS[d] one step in direction d, _NEIGHBORS_2[d] two steps, SQUARES when off the board
+_NEIGHBORS = np.array([[target if target >= 0 else SQUARES for target in NEIGHBORS[d]] for d in range(4)])
+_NEIGHBORS_2 = np.array([[NEIGHBORS[d][target] if target >= 0 and NEIGHBORS[d][target] >= 0 else SQUARES
+                          for target in NEIGHBORS[d]] for d in range(4)])
+
+def _flags(mask):
+    return np.array([bool(mask >> square & 1) for square in range(SQUARES)])
+
+_ROW = np.array([row_col(square)[0] for square in range(SQUARES)])
+_EDGE = _flags(EDGE)
+_CENTRAL = _flags(CENTRAL)
+_MAIN_DIAGONAL = _flags(MAIN_DIAGONAL)
+_DOUBLE_DIAGONAL = _flags(DOUBLE_DIAGONAL)
+_WHITE_DEFENDER = _flags(WHITE_DEFENDER_ROWS)
+_RED_DEFENDER = _flags(RED_DEFENDER_ROWS)
+
+def encode_masks(masks):
+    """Rows for a sequence of (white, red, kings) masks, like BitBoard's."""
+    masks = np.asarray(masks, dtype=np.int64).reshape(-1, 3)
+    bits = (masks[:, :, None] >> np.arange(SQUARES)) & 1
+    return ((bits[:, 0] - bits[:, 1]) * (1 + bits[:, 2])).astype(np.int8)
+
+def encode_bitboards(positions):
+    return encode_masks([(position.white, position.red, position.kings) for position in positions])
+
+def encode_board(board):
+    row = np.zeros(SQUARES, dtype=np.int8)
+    for square in range(SQUARES):
+        board_row, col = row_col(square)
+        piece = board.board[board_row][col]
+        if piece != 0:
+            row[square] = (1 if piece.color == WHITE else -1) * (2 if piece.king else 1)
+    return row
+
+def features_batch(encoded):
+    """The 22F feature lists of every row, as a list of 23 integer arrays of length N."""
+    encoded = np.asarray(encoded, dtype=np.int8).reshape(-1, SQUARES)
+    padded = np.concatenate([encoded, np.full((len(encoded), 1), OFF_BOARD, dtype=np.int8)], axis=1)
+    white_all = (padded == WHITE_PAWN) | (padded == WHITE_KING)
+    red_all = (padded == RED_PAWN) | (padded == RED_KING)
+    king_all = (padded == WHITE_KING) | (padded == RED_KING)
+    empty_all = padded == EMPTY
+
+    white, red, kings = white_all[:, :SQUARES], red_all[:, :SQUARES], king_all[:, :SQUARES]
+    pawns = ~kings
+    nb_white = [white_all[:, _NEIGHBORS[d]] for d in range(4)]
+    nb_red = [red_all[:, _NEIGHBORS[d]] for d in range(4)]
+    nb_king = [king_all[:, _NEIGHBORS[d]] for d in range(4)]
+    nb_empty = [empty_all[:, _NEIGHBORS[d]] for d in range(4)]
+    empty_2 = [empty_all[:, _NEIGHBORS_2[d]] for d in range(4)]
+
+    # Board.is_attacking_pawn, Board.is_movable, Board.is_protected, Board.is_loner_piece (quirks included)
+    red_up = (nb_red[UP_LEFT] & empty_2[UP_LEFT]) | (nb_red[UP_RIGHT] & empty_2[UP_RIGHT])
+    red_down = (nb_red[DOWN_LEFT] & empty_2[DOWN_LEFT]) | (nb_red[DOWN_RIGHT] & empty_2[DOWN_RIGHT])
+    white_up = (nb_white[UP_LEFT] & empty_2[UP_LEFT]) | (nb_white[UP_RIGHT] & empty_2[UP_RIGHT])
+    white_down = (nb_white[DOWN_LEFT] & empty_2[DOWN_LEFT]) | (nb_white[DOWN_RIGHT] & empty_2[DOWN_RIGHT])
+    white_attacking = white & ((kings & red_up) | red_down)
+    red_attacking = red & (white_up | (kings & white_down))
+
+    open_right = nb_empty[UP_RIGHT] | nb_empty[DOWN_RIGHT]
+    white_movable = white & (kings | open_right | nb_empty[DOWN_LEFT] | white_attacking)
+    red_movable = red & (kings | open_right | nb_empty[UP_LEFT] | red_attacking)
+
+    unprotected = (nb_white[UP_LEFT] & red) | (nb_king[UP_LEFT] & nb_empty[DOWN_RIGHT]) | \
+        (nb_white[UP_RIGHT] & red) | (nb_king[UP_RIGHT] & nb_empty[DOWN_LEFT]) | \
+        (nb_red[DOWN_LEFT] & white) | (nb_king[DOWN_LEFT] & nb_empty[UP_RIGHT]) | \
+        (nb_red[DOWN_RIGHT] & white) | (nb_king[DOWN_RIGHT] & nb_empty[UP_LEFT])
+    protected = _EDGE | ~unprotected
+
+    white_loners = white & ~(nb_white[0] | nb_white[1] | nb_white[2] | nb_white[3])
+    red_loners = red & ~(nb_red[0] | nb_red[1] | nb_red[2] | nb_red[3])
+
+    def diff(white_bits, red_bits):
+        return white_bits.sum(axis=1, dtype=np.int64) - red_bits.sum(axis=1, dtype=np.int64)
+
+    white_pawns, red_pawns = white & pawns, red & pawns
+    white_kings, red_kings = white & kings, red & kings
+    distance = (red_pawns * _ROW).sum(axis=1) - (white_pawns * (ROWS - 1 - _ROW)).sum(axis=1)
+
+    def at(bits, row, col):
+        return bits[:, square_of(row, col)].astype(np.int64)
+
+    def king_in_corner(bits):
+        first = at(bits & kings, 0, 7)
+        return first * (1 + at(bits & kings, 7, 0))
+
+    return [
+        diff(white, red),
+        diff(white_kings, red_kings),
+        distance,
+        diff(white_pawns & protected, red_pawns & protected),
+        diff(white_kings & protected, red_kings & protected),
+        diff(white_attacking, red_attacking),
+        diff(white_pawns & _CENTRAL, red_pawns & _CENTRAL),
+        diff(white_kings & _CENTRAL, red_kings & _CENTRAL),
+        diff(white_movable & pawns, red_movable & pawns),
+        diff(white_movable & kings, red_movable & kings),
+        np.zeros(len(encoded), dtype=np.int64),
+        diff(white & _WHITE_DEFENDER, red & _RED_DEFENDER),
+        diff(white_pawns & _MAIN_DIAGONAL, red_pawns & _MAIN_DIAGONAL),
+        diff(white_kings & _MAIN_DIAGONAL, red_kings & _MAIN_DIAGONAL),
+        diff(white_pawns & _DOUBLE_DIAGONAL, red_pawns & _DOUBLE_DIAGONAL),
+        diff(white_kings & _DOUBLE_DIAGONAL, red_kings & _DOUBLE_DIAGONAL),
+        diff(red_loners & pawns, white_loners & pawns),
+        diff(red_loners & kings, white_loners & kings),
+        at(white, 0, 1) * at(white, 0, 5) - at(red, 7, 2) * at(red, 7, 6),
+        at(white, 6, 7) * at(red, 7, 6) - at(white, 0, 1) * at(red, 1, 0),
+        king_in_corner(red) - king_in_corner(white),
+        at(red, 7, 0) - at(white, 0, 7),
+        (~red_movable.any(axis=1)).astype(np.int64) - (~white_movable.any(axis=1)).astype(np.int64),
+    ]
+
+def evaluate_batch(encoded, weights=WEIGHTS_22F):
+    """evaluate_22F of every row of an N x 32 encoded array, as a float array of length N."""
+    return np.asarray(score_22F(features_batch(encoded), weights), dtype=np.float64)
+
+class FrontierEvaluator:
+    """
+    Scores all the children of a node in one evaluate_batch call. minimax_alpha_beta uses it
+    (batch argument) on the nodes one step above the leaves instead of evaluating leaf by leaf.
+    """
+
+    def __init__(self, weights=WEIGHTS_22F):
+        self.weights = weights
+
+    def evaluate_children(self, position, moves):
+        if isinstance(position, BitBoard):
+            children = []
+            for move in moves:
+                position.make_move(move)
+                children.append((position.white, position.red, position.kings))
+                position.unmake_move(move)
+            encoded = encode_masks(children)
+        else:
+            encoded = np.empty((len(moves), SQUARES), dtype=np.int8)
+            for index, move in enumerate(moves):
+                position.make_move(move)
+                encoded[index] = encode_board(position)
+                position.unmake_move(move)
+        return evaluate_batch(encoded, self.weights).tolist()
@@ -0,0 +1,505 @@
+"""
+Position as three 32 bit masks (white, red, kings), square s is cell s+1 of the diagram in board.py.
+Moves are generated exactly like Board.get_valid_moves.
+"""
+
+import random
+from .constants import ROWS, COLS, RED, WHITE
+from .board import Board
+from .piece import Piece
+from .zobrist import PIECE_KEYS
+from .evaluation import score_22F
+from .analysis import Analysis
+from .squares import SQUARES, UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT, OPPOSITE, NEIGHBORS, square_of, row_col, \
+    EDGE_SQUARES, CENTRAL_SQUARES, MAIN_DIAGONAL_SQUARES, DOUBLE_DIAGONAL_SQUARES, DEFENDER_SQUARES
+
+FULL = (1 << SQUARES) - 1
+
+def _build_shifts():
+    # the offset between a square and its neighbor depends on the row parity,
+    # so every direction is a couple of (source mask, offset) pairs
+    shifts = []
+    for table in NEIGHBORS:
+        by_offset = {}
+        for square, target in enumerate(table):
+            if target >= 0:
+                by_offset[target - square] = by_offset.get(target - square, 0) | (1 << square)
+        shifts.append(tuple((mask, offset) for offset, mask in by_offset.items()))
+    return tuple(shifts)
+
+_SHIFTS = _build_shifts()
+
+def shift(bits, direction):
+    """Moves every bit of `bits` one step in `direction`, dropping the ones that fall off the board."""
+    out = 0
+    for mask, offset in _SHIFTS[direction]:
+        if offset > 0:
+            out |= (bits & mask) << offset
+        else:
+            out |= (bits & mask) >> -offset
+    return out
+
+def neighbor_in(bits, direction):
+    """Squares whose neighbor in `direction` is in `bits`."""
+    return shift(bits, OPPOSITE[direction])
+
+def iter_bits(bits):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+def _mask(cells):
+    bits = 0
+    for row, col in cells:
+        bits |= 1 << square_of(row, col)
+    return bits
+
+def _squares_mask(squares):
+    return sum(1 << square for square in squares)
+
+ROW_MASKS = tuple(0xF << (4 * row) for row in range(ROWS))
+PROMOTION_ROWS = ROW_MASKS[0] | ROW_MASKS[ROWS - 1]
+EDGE = _squares_mask(EDGE_SQUARES)
+CENTRAL = _squares_mask(CENTRAL_SQUARES)
+MAIN_DIAGONAL = _squares_mask(MAIN_DIAGONAL_SQUARES)   # empty, see evaluate_22F
+DOUBLE_DIAGONAL = _squares_mask(DOUBLE_DIAGONAL_SQUARES)
+MIDDLE_SQUARE = _mask((row, col) for row in range(2, 6) for col in range(2, 6) if (row + col) % 2 == 1)
+MIDDLE_ROWS = ROW_MASKS[3] | ROW_MASKS[4]
+WHITE_DEFENDER_ROWS = _squares_mask(DEFENDER_SQUARES[WHITE])
+RED_DEFENDER_ROWS = _squares_mask(DEFENDER_SQUARES[RED])
+
+def _square_keys(color, king):
+    return tuple(PIECE_KEYS[(color, king)][row][col] for row, col in map(row_col, range(SQUARES)))
+
+# Zobrist keys by square, the same numbers Board uses so both backends share position keys
+WHITE_KEYS, WHITE_KING_KEYS = _square_keys(WHITE, False), _square_keys(WHITE, True)
+RED_KEYS, RED_KING_KEYS = _square_keys(RED, False), _square_keys(RED, True)
+
+class BitBoard:
+    __slots__ = ('white', 'red', 'kings', 'zobrist', '_history', '_analysis', '_analyses')
+
+    def __init__(self, white=0, red=0, kings=0, zobrist=None):
+        self.white = white
+        self.red = red
+        self.kings = kings
+        self.zobrist = self._compute_hash() if zobrist is None else zobrist
+        self._history = []
+        self._analysis = None       # Analysis of the masks it was made for, see analysis()
+        self._analyses = []         # the analyses of the positions make_move left, given back by unmake_move
+
+    def _key(self, square):
+        bit = 1 << square
+        if self.white & bit:
+            return WHITE_KING_KEYS[square] if self.kings & bit else WHITE_KEYS[square]
+        return RED_KING_KEYS[square] if self.kings & bit else RED_KEYS[square]
+
+    def _compute_hash(self):
+        key = 0
+        for square in iter_bits(self.white | self.red):
+            key ^= self._key(square)
+        return key
+
+    @classmethod
+    def initial(cls):
+        return cls(ROW_MASKS[0] | ROW_MASKS[1] | ROW_MASKS[2], ROW_MASKS[5] | ROW_MASKS[6] | ROW_MASKS[7], 0)
+
+    @classmethod
+    def from_board(cls, board):
+        white = red = kings = 0
+        for row in board.board:
+            for piece in row:
+                if piece != 0:
+                    bit = 1 << square_of(piece.row, piece.col)
+                    if piece.color == WHITE:
+                        white |= bit
+                    else:
+                        red |= bit
+                    if piece.king:
+                        kings |= bit
+        return cls(white, red, kings)
+
+    def to_board(self):
+        board = Board()
+        board.board = [[0] * COLS for _ in range(ROWS)]
+        for square in iter_bits(self.white | self.red):
+            row, col = row_col(square)
+            piece = Piece(row, col, WHITE if self.white >> square & 1 else RED)
+            if self.kings >> square & 1:
+                piece.make_king()
+            board.board[row][col] = piece
+        board.white_left = self.white.bit_count()
+        board.red_left = self.red.bit_count()
+        board.white_kings = (self.white & self.kings).bit_count()
+        board.red_kings = (self.red & self.kings).bit_count()
+        board.recompute()
+        return board
+
+    def copy(self):
+        return BitBoard(self.white, self.red, self.kings, self.zobrist)
+
+    def __eq__(self, other):
+        return isinstance(other, BitBoard) and \
+            (self.white, self.red, self.kings) == (other.white, other.red, other.kings)
+
+    def __hash__(self):
+        return hash((self.white, self.red, self.kings))
+
+    def __repr__(self):
+        return 'BitBoard(white=0x%08x, red=0x%08x, kings=0x%08x)' % (self.white, self.red, self.kings)
+
+    def _sides(self, color):
+        if color == WHITE:
+            return self.white, self.red
+        return self.red, self.white
+
+    def color_at(self, square):
+        if self.white >> square & 1:
+            return WHITE
+        if self.red >> square & 1:
+            return RED
+        return None
+
+    def winner(self):
+        if not self.red:
+            return WHITE
+        elif not self.white:
+            return RED
+        return None
+
+    # move generation
+
+    def get_valid_moves(self, square):
+        """Same as Board.get_valid_moves for the piece on `square`: {destination: captured mask}."""
+        color = self.color_at(square)
+        if color is None:
+            return {}
+        own, opp = self._sides(color)
+        king = bool(self.kings >> square & 1)
+        moves = {}
+        if color == RED or king:
+            moves.update(self._traverse(square, UP_LEFT, own, opp, king, 0, 0))
+            moves.update(self._traverse(square, UP_RIGHT, own, opp, king, 0, 0))
+        if color == WHITE or king:
+            moves.update(self._traverse(square, DOWN_LEFT, own, opp, king, 0, 0))
+            moves.update(self._traverse(square, DOWN_RIGHT, own, opp, king, 0, 0))
+        return moves
+
+    def _traverse(self, square, direction, own, opp, king, skipped, jumped):
+        # mirrors Board._traverse_left/_traverse_right: a chain keeps going forward on both
+        # sides, kings also step back on the same side, and only the last two captures are kept
+        moves = {}
+        first = NEIGHBORS[direction][square]
+        if first < 0:
+            return moves
+        bit = 1 << first
+        if not (own | opp) & bit:
+            if not skipped:
+                moves[first] = 0
+            return moves
+        if own & bit or jumped & bit:
+            return moves
+        landing = NEIGHBORS[direction][first]
+        if landing < 0 or (own | opp) >> landing & 1:
+            return moves
+        moves[landing] = bit | skipped
+        jumped |= bit
+        forward = direction & 2
+        moves.update(self._traverse(landing, forward | 0, own, opp, king, bit, jumped))
+        moves.update(self._traverse(landing, forward | 1, own, opp, king, bit, jumped))
+        if king:
+            moves.update(self._traverse(landing, direction ^ 2, own, opp, king, bit, jumped))
+        return moves
+
+    def _directions(self, color):
+        if color == RED:
+            return (UP_LEFT, UP_RIGHT), (DOWN_LEFT, DOWN_RIGHT)
+        return (DOWN_LEFT, DOWN_RIGHT), (UP_LEFT, UP_RIGHT)
+
+    def jumpers(self, color):
+        """Mask of the pieces of `color` that have at least one capture."""
+        own, opp = self._sides(color)
+        empty = ~(own | opp) & FULL
+        forward, backward = self._directions(color)
+        bits = 0
+        for direction in forward:
+            bits |= neighbor_in(neighbor_in(empty, direction) & opp, direction) & own
+        kings = own & self.kings
+        if kings:
+            for direction in backward:
+                bits |= neighbor_in(neighbor_in(empty, direction) & opp, direction) & kings
+        return bits
+
+    def get_captures(self, color):
+        """The moves of get_all_moves that capture, without generating the others."""
+        moves = []
+        for square in iter_bits(self.jumpers(color)):
+            for destination, captured in self.get_valid_moves(square).items():
+                if captured:
+                    moves.append((square, destination, captured))
+        return moves
+
+    def get_all_moves(self, color):
+        """List of (origin, destination, captured mask), captures first."""
+        own, opp = self._sides(color)
+        king_bits = own & self.kings
+        moves = []
+        forward, backward = self._directions(color)
+        for square in iter_bits(self.jumpers(color)):
+            for destination, captured in self.get_valid_moves(square).items():
+                if captured:
+                    moves.append((square, destination, captured))
+
+        empty = ~(own | opp) & FULL
+        for direction in forward + backward:
+            movers = own if direction in forward else king_bits
+            back = OPPOSITE[direction]
+            for destination in iter_bits(shift(movers, direction) & empty):
+                moves.append((NEIGHBORS[back][destination], destination, 0))
+        return moves
+
+    def move(self, origin, destination, captured):
+        """Applies a move in place, promoting like Board.move."""
+        start, end = 1 << origin, 1 << destination
+        key = self.zobrist ^ self._key(origin)
+        for square in iter_bits(captured):
+            key ^= self._key(square)
+        if self.white & start:
+            self.white ^= start | end
+            self.red &= ~captured
+        else:
+            self.red ^= start | end
+            self.white &= ~captured
+        if self.kings & start:
+            self.kings ^= start | end
+        elif end & PROMOTION_ROWS:
+            self.kings |= end
+        self.kings &= ~captured
+        self.zobrist = key ^ self._key(destination)
+
+    # same make/unmake interface as Board, the undo information is just the masks and the key
+    def make_move(self, move):
+        self._history.append((self.white, self.red, self.kings, self.zobrist))
+        self._analyses.append(self._analysis)
+        self.move(*move)
+
+    def unmake_move(self, move):
+        self.white, self.red, self.kings, self.zobrist = self._history.pop()
+        self._analysis = self._analyses.pop()
+
+    def analysis(self):
+        """Analysis (checkers/analysis.py) of the current masks, the same object until they change."""
+        analysis = self._analysis
+        #moves are plain tuples: an analysis of the same masks is right however they came back
+        if analysis is None or analysis.key != (self.white, self.red, self.kings):
+            analysis = self._analysis = Analysis(self, (self.white, self.red, self.kings))
+        return analysis
+
+    def apply(self, move):
+        child = self.copy()
+        child.move(*move)
+        return child
+
+    def get_children(self, color):
+        return [self.apply(move) for move in self.get_all_moves(color)]
+
+    # evaluation
+
+    def evaluate(self):
+        white_kings = (self.white & self.kings).bit_count()
+        red_kings = (self.red & self.kings).bit_count()
+        return self.white.bit_count() - self.red.bit_count() + (white_kings * 0.5 - red_kings * 0.5)
+
+    def advanced_evaluate(self):
+        """Board.advanced_evaluate with masks (row 0 counts as back row for both colors, like there)."""
+        white, red, kings = self.white, self.red, self.kings
+        empty = ~(white | red) & FULL
+
+        #Board.is_protected: an opponent that can jump forward onto it, or any king with the square behind free
+        unprotected = (white & (neighbor_in(red, DOWN_LEFT) | neighbor_in(red, DOWN_RIGHT))) | \
+                      (red & (neighbor_in(white, UP_LEFT) | neighbor_in(white, UP_RIGHT)))
+        for d in range(4):
+            unprotected |= neighbor_in(kings, d) & neighbor_in(empty, OPPOSITE[d])
+        protected = ~unprotected | EDGE
+
+        def count(bits):
+            return (white & bits).bit_count() - (red & bits).bit_count()
+
+        score = count(FULL)
+        score += count(kings) * 3
+        score += count(ROW_MASKS[0]) * 2
+        score += count(MIDDLE_SQUARE)
+        score += count(MIDDLE_ROWS) * 2
+        score += count(protected)
+        return score
+
+    def _movable(self):
+        """Masks of the white and red pieces Board.is_movable accepts, predicate quirks included."""
+        white, red, kings = self.white, self.red, self.kings
+        empty = ~(white | red) & FULL
+        empty_two = [neighbor_in(neighbor_in(empty, d), d) for d in range(4)]
+
+        def attacks(opp, directions):
+            bits = 0
+            for d in directions:
+                bits |= neighbor_in(opp, d) & empty_two[d]
+            return bits
+
+        up, down = (UP_LEFT, UP_RIGHT), (DOWN_LEFT, DOWN_RIGHT)
+        white_attacking = white & ((kings & attacks(red, up)) | attacks(red, down))
+        red_attacking = red & (attacks(white, up) | (kings & attacks(white, down)))
+
+        open_right = neighbor_in(empty, UP_RIGHT) | neighbor_in(empty, DOWN_RIGHT)
+        white_movable = white & (kings | open_right | neighbor_in(empty, DOWN_LEFT) | white_attacking)
+        red_movable = red & (kings | open_right | neighbor_in(empty, UP_LEFT) | red_attacking)
+        return white_movable, red_movable, white_attacking, red_attacking
+
+    def _protected(self):
+        """Mask of the pieces Board.is_protected accepts."""
+        white, red, kings = self.white, self.red, self.kings
+        empty = ~(white | red) & FULL
+        unprotected = (neighbor_in(white, UP_LEFT) & red) | (neighbor_in(kings, UP_LEFT) & neighbor_in(empty, DOWN_RIGHT)) | \
+            (neighbor_in(white, UP_RIGHT) & red) | (neighbor_in(kings, UP_RIGHT) & neighbor_in(empty, DOWN_LEFT)) | \
+            (neighbor_in(red, DOWN_LEFT) & white) | (neighbor_in(kings, DOWN_LEFT) & neighbor_in(empty, UP_RIGHT)) | \
+            (neighbor_in(red, DOWN_RIGHT) & white) | (neighbor_in(kings, DOWN_RIGHT) & neighbor_in(empty, UP_LEFT))
+        return EDGE | ~unprotected
+
+    def _loners(self):
+        """Masks of the white and red pieces Board.is_loner_piece accepts."""
+        def loners(bits):
+            company = 0
+            for d in range(4):
+                company |= neighbor_in(bits, d)
+            return bits & ~company
+
+        return loners(self.white), loners(self.red)
+
+    def movable_counts(self):
+        """(white, red) numbers of pieces Board.is_movable accepts."""
+        white_movable, red_movable, _, _ = self.analysis().term('movable', BitBoard._movable)
+        return white_movable.bit_count(), red_movable.bit_count()
+
+    def is_winner(self, color):
+        return self.analysis().is_winner(color)
+
+    def evaluate_22F(self):
+        """Board.evaluate_22F computed with mask arithmetic, same features and same weights (checkers/evaluation.py)."""
+        white, red, kings = self.white, self.red, self.kings
+        white_pawns, white_kings = white & ~kings, white & kings
+        red_pawns, red_kings = red & ~kings, red & kings
+
+        white_movable, red_movable, white_attacking, red_attacking = self.analysis().term('movable', BitBoard._movable)
+        protected = self._protected()
+        white_loners, red_loners = self._loners()
+
+        def count(bits):
+            return bits.bit_count()
+
+        num_pawns = count(white) - count(red)
+        num_kings = count(white_kings) - count(red_kings)
+        distance_score = 0
+        for row in range(ROWS):
+            distance_score += count(red_pawns & ROW_MASKS[row]) * row
+            distance_score -= count(white_pawns & ROW_MASKS[row]) * (ROWS - 1 - row)
+        save_pawn_score = count(white_pawns & protected) - count(red_pawns & protected)
+        save_king_score = count(white_kings & protected) - count(red_kings & protected)
+        attacking_pawn_score = count(white_attacking) - count(red_attacking)
+        central_pawn_score = count(white_pawns & CENTRAL) - count(red_pawns & CENTRAL)
+        central_king_score = count(white_kings & CENTRAL) - count(red_kings & CENTRAL)
+        movable_pawn_score = count(white_movable & ~kings) - count(red_movable & ~kings)
+        movable_king_score = count(white_movable & kings) - count(red_movable & kings)
+        unoccupied_promotion_score = 0  # white minus white in Board.evaluate_22F
+        defender_score = count(white & WHITE_DEFENDER_ROWS) - count(red & RED_DEFENDER_ROWS)
+        main_diagonal_pawn_score = count(white_pawns & MAIN_DIAGONAL) - count(red_pawns & MAIN_DIAGONAL)
+        main_diagonal_king_score = count(white_kings & MAIN_DIAGONAL) - count(red_kings & MAIN_DIAGONAL)
+        double_diagonal_pawn_score = count(white_pawns & DOUBLE_DIAGONAL) - count(red_pawns & DOUBLE_DIAGONAL)
+        double_diagonal_king_score = count(white_kings & DOUBLE_DIAGONAL) - count(red_kings & DOUBLE_DIAGONAL)
+        loner_pawn_score = count(red_loners & ~kings) - count(white_loners & ~kings)
+        loner_king_score = count(red_loners & kings) - count(white_loners & kings)
+
+        def has(bits, row, col):
+            return bool(bits >> square_of(row, col) & 1)
+
+        bridge_score = (1 if has(white, 0, 1) and has(white, 0, 5) else 0) - (1 if has(red, 7, 2) and has(red, 7, 6) else 0)
+        dog_score = (1 if has(white, 6, 7) and has(red, 7, 6) else 0) - (1 if has(white, 0, 1) and has(red, 1, 0) else 0)
+
+        def king_in_corner(bits):
+            if has(bits & kings, 0, 7):
+                return 2 if has(bits & kings, 7, 0) else 1
+            return 0
+
+        king_in_corner_score = king_in_corner(red) - king_in_corner(white)
+        pawn_in_corner_score = (1 if has(red, 7, 0) else 0) - (1 if has(white, 0, 7) else 0)
+        winning_score = (0 if red_movable else 1) - (0 if white_movable else 1)
+
+        return score_22F([num_pawns, num_kings, distance_score, save_pawn_score, save_king_score, attacking_pawn_score,
+                          central_pawn_score, central_king_score, movable_pawn_score, movable_king_score,
+                          unoccupied_promotion_score, defender_score, main_diagonal_pawn_score, main_diagonal_king_score,
+                          double_diagonal_pawn_score, double_diagonal_king_score, loner_pawn_score, loner_king_score,
+                          bridge_score, dog_score, king_in_corner_score, pawn_in_corner_score, winning_score])
+
+def to_board_move(board, move, color):
+    """The Move of `board` matching the BitBoard move tuple `move`, None if `color` has no such move."""
+    origin, destination, _ = move
+    for candidate in board.get_all_moves(color):
+        if square_of(*candidate.start) == origin and square_of(*candidate.end) == destination:
+            return candidate
+    return None
+
+def from_board_move(move):
+    """The BitBoard move tuple of a Board Move."""
+    return (square_of(*move.start), square_of(*move.end),
+            sum(1 << square_of(piece.row, piece.col) for piece in move.captured))
+
+# parity with Board, run with `python -m checkers.bitboard`
+
+def _board_moves(board, piece):
+    return {square_of(*destination): sum(1 << square_of(p.row, p.col) for p in skipped)
+            for destination, skipped in board.get_valid_moves(piece).items()}
+
+def check_parity(games=200, max_plies=120, seed=0):
+    """Plays random games on a Board and compares every move set (and evaluate_22F, advanced_evaluate) with BitBoard.
+    Returns a list of mismatch descriptions, empty when both backends agree."""
+    rng = random.Random(seed)
+    mismatches = []
+    for game in range(games):
+        board = Board()
+        turn = RED
+        for ply in range(max_plies):
+            position = BitBoard.from_board(board)
+            if BitBoard.from_board(position.to_board()) != position:
+                mismatches.append((game, ply, 'conversion', position))
+            if position.zobrist != board.zobrist:
+                mismatches.append((game, ply, 'zobrist', position))
+            if abs(position.evaluate_22F() - board.evaluate_22F()) > 1e-9:
+                mismatches.append((game, ply, 'evaluate_22F', position))
+            if position.advanced_evaluate() != board.advanced_evaluate():
+                mismatches.append((game, ply, 'advanced_evaluate', position))
+
+            legal = []
+            for piece in board.get_all_pieces(turn):
+                expected = _board_moves(board, piece)
+                got = position.get_valid_moves(square_of(piece.row, piece.col))
+                if expected != got:
+                    mismatches.append((game, ply, 'moves', position, piece.row, piece.col, expected, got))
+                legal.extend((piece, destination) for destination in board.get_valid_moves(piece).items())
+
+            expected_all = sorted((square_of(p.row, p.col), square_of(*d), sum(1 << square_of(s.row, s.col) for s in skipped))
+                                  for p, (d, skipped) in legal)
+            if expected_all != sorted(position.get_all_moves(turn)):
+                mismatches.append((game, ply, 'all moves', position))
+
+            if not legal or board.winner() is not None:
+                break
+            piece, ((row, col), skipped) = rng.choice(legal)
+            board.move(piece, row, col)
+            if skipped:
+                board.remove(skipped)
+            turn = WHITE if turn == RED else RED
+    return mismatches
+
+if __name__ == '__main__':
+    problems = check_parity()
+    for problem in problems[:20]:
+        print(problem)
+    print('parity ok' if not problems else '%d mismatches' % len(problems))
@@ -1,15 +1,47 @@
-import pygame
 from .constants import BLACK, ROWS, RED, SQUARE_SIZE, COLS, WHITE, BEIGE
 from .piece import Piece
+from .move import Move
+from .zobrist import piece_key, compute_hash
+from .evaluation import EvalState, score_22F, WHITE_MOVABLE, RED_MOVABLE
+from .analysis import Analysis
+from .squares import CELLS, NEIGHBOR_CELLS, ADJACENT_CELLS, JUMPS_UP, JUMPS_DOWN, PROTECTION, DEFENDER_SQUARES, PROMOTION_SQUARES, \
+    CENTRAL_SQUARES, MAIN_DIAGONAL_SQUARES, DOUBLE_DIAGONAL_SQUARES
 
 class Board:
     def __init__(self):
         self.board = []
         self.red_left = self.white_left = 12
         self.red_kings = self.white_kings = 0
+        self._analyses = []     # the analyses of the positions make_move left, given back by unmake_move
         self.create_board()
+        self.recompute()
     
+    #rebuilds the incremental data (zobrist key, evaluation state), needed after editing self.board directly
+    def recompute(self):
+        self.zobrist = compute_hash(self)
+        self.eval_state = EvalState(self)
+        self._analysis = None
+
+    #Analysis (checkers/analysis.py) of the current position, the same object until a piece moves
+    def analysis(self):
+        if self._analysis is None:
+            self._analysis = Analysis(self)
+        return self._analysis
+
+    #copies (deepcopy, pickle) leave the analyses behind, they are rebuilt on demand
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_analysis'] = None
+        state['_analyses'] = [None] * len(self._analyses)
+        return state
+
+    #(white, red) numbers of pieces is_movable accepts, kept by the evaluation state
+    def movable_counts(self):
+        totals = self.eval_state.totals
+        return totals[WHITE_MOVABLE], totals[RED_MOVABLE]
+
     def draw_squares(self, win):
+        import pygame
         win.fill(BLACK)
         for row in range(ROWS):
             for col in range(row % 2, COLS, 2):
@@ -24,15 +56,70 @@ class Board:
         return pieces
 
     def move(self, piece, row, col):
+        start = (piece.row, piece.col)
+        self.zobrist ^= piece_key(piece)
         self.board[piece.row][piece.col], self.board[row][col] = self.board[row][col], self.board[piece.row][piece.col]
         piece.move(row, col)
 
-        if row == ROWS - 1 or row == 0:
+        if (row == ROWS - 1 or row == 0) and not piece.king:
             piece.make_king()
             if piece.color == WHITE:
                 self.white_kings += 1
             else:
                 self.red_kings += 1 
+        self.zobrist ^= piece_key(piece)
+        self.eval_state.update((start, (row, col)))
+        self._analysis = None
+
+    def get_all_moves(self, color):
+        moves = []
+        for piece in self.get_all_pieces(color):
+            for end, skipped in self.get_valid_moves(piece).items():
+                moves.append(Move((piece.row, piece.col), end, skipped))
+        return moves
+
+    #the moves of get_all_moves that capture (quiescence search)
+    def get_captures(self, color):
+        moves = []
+        for piece in self.get_all_pieces(color):
+            for end, skipped in self.get_valid_moves(piece).items():
+                if skipped:
+                    moves.append(Move((piece.row, piece.col), end, skipped))
+        return moves
+
+    #applies a move in place, unmake_move puts back the board exactly as it was (counters included)
+    def make_move(self, move):
+        self.eval_state.push()
+        self._analyses.append(self._analysis)
+        piece = self.board[move.start[0]][move.start[1]]
+        move.promoted = not piece.king and (move.end[0] == ROWS - 1 or move.end[0] == 0)
+        self.move(piece, move.end[0], move.end[1])
+        if move.captured:
+            self.remove(move.captured)
+
+    def unmake_move(self, move):
+        row, col = move.end
+        piece = self.board[row][col]
+        self.zobrist ^= piece_key(piece)
+        self.board[row][col] = 0
+        self.board[move.start[0]][move.start[1]] = piece
+        piece.move(move.start[0], move.start[1])
+        if move.promoted:
+            piece.king = False
+            if piece.color == WHITE:
+                self.white_kings -= 1
+            else:
+                self.red_kings -= 1
+        self.zobrist ^= piece_key(piece)
+        for captured in move.captured:
+            self.board[captured.row][captured.col] = captured
+            self.zobrist ^= piece_key(captured)
+            if captured.color == RED:
+                self.red_left += 1
+            else:
+                self.white_left += 1
+        self.eval_state.pop()
+        self._analysis = self._analyses.pop()
 
     def get_piece(self, row, col):
         if row < 0 or row > ROWS - 1 or col < 0 or col > COLS - 1:
@@ -65,10 +152,13 @@ class Board:
         for piece in pieces:
             self.board[piece.row][piece.col] = 0
             if piece != 0:
+                self.zobrist ^= piece_key(piece)
                 if piece.color == RED:
                     self.red_left -= 1
                 else:
                     self.white_left -= 1
+        self.eval_state.update([(piece.row, piece.col) for piece in pieces])
+        self._analysis = None
     
     def winner(self):
         if self.red_left <= 0:
@@ -93,7 +183,7 @@ class Board:
         
         return moves
 
-    def _traverse_left(self, start, stop, step, color, left, king, skipped=[]):
+    def _traverse_left(self, start, stop, step, color, left, king, skipped=[], jumped=()):
         moves = {}
         last = []
         for r in range(start, stop, step):
@@ -114,16 +204,17 @@ class Board:
                         row = max(r-3, -1)
                     else:
                         row = min(r+3, ROWS)
-                    moves.update(self._traverse_left(r+step, row, step, color, left-1, king, skipped=last))
-                    moves.update(self._traverse_right(r+step, row, step, color, left+1, king, skipped=last))
+                    moves.update(self._traverse_left(r+step, row, step, color, left-1, king, skipped=last, jumped=jumped + tuple(last)))
+                    moves.update(self._traverse_right(r+step, row, step, color, left+1, king, skipped=last, jumped=jumped + tuple(last)))
                     if king:
                         if step == -1:
-                            moves.update(self._traverse_left(r-step, min(r+3, ROWS), -step, color, left-1, king, skipped=last))
+                            moves.update(self._traverse_left(r-step, min(r+3, ROWS), -step, color, left-1, king, skipped=last, jumped=jumped + tuple(last)))
                         else:
-                            moves.update(self._traverse_left(r-step, max(r-3, -1), -step, color, left-1, king, skipped=last))
+                            moves.update(self._traverse_left(r-step, max(r-3, -1), -step, color, left-1, king, skipped=last, jumped=jumped + tuple(last)))
                         
                 break
-            elif current.color == color:
+            #a piece already jumped in this chain blocks it, or a king could go round in circles forever
+            elif current.color == color or current in jumped:
                 break
             else:
                 last = [current]
@@ -132,7 +223,7 @@ class Board:
         
         return moves
 
-    def _traverse_right(self, start, stop, step, color, right, king, skipped=[]):
+    def _traverse_right(self, start, stop, step, color, right, king, skipped=[], jumped=()):
         moves = {}
         last = []
         for r in range(start, stop, step):
@@ -153,16 +244,17 @@ class Board:
                         row = max(r-3, -1)
                     else:
                         row = min(r+3, ROWS)
-                    moves.update(self._traverse_left(r+step, row, step, color, right-1, king, skipped=last))
-                    moves.update(self._traverse_right(r+step, row, step, color, right+1, king, skipped=last))
+                    moves.update(self._traverse_left(r+step, row, step, color, right-1, king, skipped=last, jumped=jumped + tuple(last)))
+                    moves.update(self._traverse_right(r+step, row, step, color, right+1, king, skipped=last, jumped=jumped + tuple(last)))
                     if king:
                         if king:
                             if step == -1:
-                                moves.update(self._traverse_right(r-step, min(r+3, ROWS), -step, color, right+1, king, skipped=last))
+                                moves.update(self._traverse_right(r-step, min(r+3, ROWS), -step, color, right+1, king, skipped=last, jumped=jumped + tuple(last)))
                             else:
-                                moves.update(self._traverse_right(r-step, max(r-3, -1), -step, color, right+1, king, skipped=last))
+                                moves.update(self._traverse_right(r-step, max(r-3, -1), -step, color, right+1, king, skipped=last, jumped=jumped + tuple(last)))
                 break
-            elif current.color == color:
+            #a piece already jumped in this chain blocks it, or a king could go round in circles forever
+            elif current.color == color or current in jumped:
                 break
             else:
                 last = [current]
@@ -174,119 +266,89 @@ class Board:
     #doesn't check if is in danger in a chain of captures
     # TODO refactor
     def is_protected(self, piece):
-        if piece.col == 0 or piece.col == COLS-1 or piece.row == 0 or piece.row == ROWS-1:
+        checks = PROTECTION[piece.row * 4 + piece.col // 2]
+        if checks is None:  # on the edge
             return True
-        attacker = self.get_piece(piece.row-1, piece.col-1)
-        if attacker != 0:
-            if piece.color != attacker.color and attacker.color == WHITE or attacker.king and self.get_piece(piece.row+1, piece.col+1) == 0:
-                return False
-        attacker = self.get_piece(piece.row-1, piece.col+1)
-        if attacker != 0:
-            if piece.color != attacker.color and attacker.color == WHITE or attacker.king and self.get_piece(piece.row+1, piece.col-1) == 0:
-                return False
-        attacker = self.get_piece(piece.row+1, piece.col-1)
-        if attacker != 0:
-            if piece.color != attacker.color and attacker.color == RED or attacker.king and self.get_piece(piece.row-1, piece.col+1) == 0:
-                return False
-        attacker = self.get_piece(piece.row+1, piece.col+1)
-        if attacker != 0:
-            if piece.color != attacker.color and attacker.color == RED or attacker.king and self.get_piece(piece.row-1, piece.col-1) == 0:
-                return False
+        board = self.board
+        for (row, col), (behind_row, behind_col), pawn_color in checks:
+            attacker = board[row][col]
+            if attacker != 0:
+                if attacker.color == pawn_color != piece.color or attacker.king and board[behind_row][behind_col] == 0:
+                    return False
         return True
-    
-    def is_attacking_pawn(self, piece):
-        res = False
 
+    #a jump in one of the piece's directions, whatever it leads to
+    def is_attacking_pawn(self, piece):
+        square = piece.row * 4 + piece.col // 2
+        board = self.board
         if piece.color == RED or piece.king:
-            if piece.row - 2 >= 0 and (piece.col >= 2 or piece.col < COLS - 2):
-                left_diagonal = self.get_piece(piece.row-1, piece.col-1)
-                left_diagonal_next = self.get_piece(piece.row-2, piece.col-2)
-                right_diagonal = self.get_piece(piece.row-1, piece.col+1)
-                right_diagonal_next = self.get_piece(piece.row-2, piece.col+2)
-                res = (left_diagonal is not None and left_diagonal != 0 and left_diagonal.color != piece.color and left_diagonal_next is not None and left_diagonal_next == 0) or (right_diagonal is not None and right_diagonal != 0 and right_diagonal.color != piece.color and right_diagonal_next is not None and right_diagonal_next == 0)
-                if res or not piece.king:
-                    return res
-        
+            for (row, col), (landing_row, landing_col) in JUMPS_UP[square]:
+                jumped = board[row][col]
+                if jumped != 0 and jumped.color != piece.color and board[landing_row][landing_col] == 0:
+                    return True
         if piece.color == WHITE or piece.king:
-            if piece.row + 2 <= ROWS - 1 and (piece.col >= 2 or piece.col < COLS - 2):
-                left_diagonal = self.get_piece(piece.row+1, piece.col-1)
-                left_diagonal_next = self.get_piece(piece.row+2, piece.col-2)
-                right_diagonal = self.get_piece(piece.row+1, piece.col+1)
-                right_diagonal_next = self.get_piece(piece.row+2, piece.col+2)
-                res = (left_diagonal is not None and left_diagonal != 0 and left_diagonal.color != piece.color and left_diagonal_next is not None and left_diagonal_next == 0) or (right_diagonal is not None and right_diagonal != 0 and right_diagonal.color != piece.color and right_diagonal_next is not None and right_diagonal_next == 0)
-                if res or not piece.king:
-                    return res
-                
+            for (row, col), (landing_row, landing_col) in JUMPS_DOWN[square]:
+                jumped = board[row][col]
+                if jumped != 0 and jumped.color != piece.color and board[landing_row][landing_col] == 0:
+                    return True
         return False
-    
+
     #if is an attacking piece, it also movable. Could be removed from this function if used smartly
+    #kings always are, and a free square up right or down right counts for both colors (the original precedence)
     def is_movable(self, piece):
-        left_upper_diagonal = self.get_piece(piece.row-1, piece.col-1)
-        right_upper_diagonal = self.get_piece(piece.row-1, piece.col+1)
-        if piece.king or piece.color == RED and (left_upper_diagonal is not None and left_upper_diagonal == 0) or (right_upper_diagonal is not None and right_upper_diagonal == 0):
+        if piece.king:
+            return True
+        board = self.board
+        up_left, up_right, down_left, down_right = NEIGHBOR_CELLS[piece.row * 4 + piece.col // 2]
+        if up_right is not None and board[up_right[0]][up_right[1]] == 0 or \
+                down_right is not None and board[down_right[0]][down_right[1]] == 0:
             return True
-        left_lower_diagonal = self.get_piece(piece.row+1, piece.col-1)
-        right_lower_diagonal = self.get_piece(piece.row+1, piece.col+1)
-        if piece.king or piece.color == WHITE and (left_lower_diagonal is not None and left_lower_diagonal == 0)  or (right_lower_diagonal is not None and right_lower_diagonal == 0):
+        forward = up_left if piece.color == RED else down_left
+        if forward is not None and board[forward[0]][forward[1]] == 0:
             return True
-        else:
-            return self.is_attacking_pawn(piece)
+        return self.is_attacking_pawn(piece)
 
     #controllare correttezza da qui in poi
 
+    #same precedence as is_movable, on the row before promotion only
     def is_promotable(self, piece):
         if piece.king or piece.color == RED and piece.row != 1 or piece.color == WHITE and piece.row != 6:
             return False
-        left_upper_diagonal = self.get_piece(piece.row-1, piece.col-1)
-        right_upper_diagonal = self.get_piece(piece.row-1, piece.col+1)
-        if piece.color == RED and (left_upper_diagonal is not None and left_upper_diagonal == 0) or (right_upper_diagonal is not None and right_upper_diagonal == 0):
-            return True
-        left_lower_diagonal = self.get_piece(piece.row+1, piece.col-1)
-        right_lower_diagonal = self.get_piece(piece.row+1, piece.col+1)
-        if piece.color == WHITE and (left_lower_diagonal is not None and left_lower_diagonal == 0)  or (right_lower_diagonal is not None and right_lower_diagonal == 0):
-            return True
+        board = self.board
+        up_left, up_right, down_left, down_right = NEIGHBOR_CELLS[piece.row * 4 + piece.col // 2]
+        forward = up_left if piece.color == RED else down_left
+        for cell in (forward, up_right, down_right):
+            if cell is not None and board[cell[0]][cell[1]] == 0:
+                return True
         return False
 
     def count_defender_pieces(self, color):
+        if color != WHITE and color != RED:
+            return -1
         count = 0
-        if color == WHITE:
-            for row in range(ROWS-2, ROWS):
-                for col in range(0, COLS):
-                    piece = self.get_piece(row, col)
-                    if piece != 0 and piece.color == WHITE:
-                        count += 1
-            return count
-        elif color == RED:
-            for row in range(0, 2):
-                for col in range(0, COLS):
-                    piece = self.get_piece(row, col)
-                    if piece != 0 and piece.color == RED:
-                        count += 1
-            return count
-        return -1
-
-    def count_unoccupied_promotion_tiles(self, color):   
+        for square in DEFENDER_SQUARES[color]:
+            row, col = CELLS[square]
+            piece = self.board[row][col]
+            if piece != 0 and piece.color == color:
+                count += 1
+        return count
+
+    #pieces (of any color) on the row `color` promotes on
+    def count_unoccupied_promotion_tiles(self, color):
+        if color != WHITE and color != RED:
+            return -1
         count = 0
-        if color == WHITE:
-            for col in range(0, COLS):
-                if col % 2 == 0 and self.get_piece(ROWS-1, col) != 0:
-                    count += 1
-            return count
-        elif color == RED:
-            for col in range(0, COLS):
-                if col % 2 == 1 and self.get_piece(0, col) != 0:
-                    count += 1
-            return count
-        return -1 
+        for square in PROMOTION_SQUARES[color]:
+            row, col = CELLS[square]
+            if self.board[row][col] != 0:
+                count += 1
+        return count
 
     def is_loner_piece(self, piece):
-        row, col = piece.row, piece.col
-        neighbors = [(row-1, col-1), (row-1, col+1), (row+1, col-1), (row+1, col+1)]
-        for r, c in neighbors:
-            if r < 0 or r >= len(self.board) or c < 0 or c >= len(self.board[0]):
-                continue  # Skip if neighbor is out of bounds
-            neighbor_piece = self.get_piece(r, c)
-            if neighbor_piece is not None and neighbor_piece != 0 and neighbor_piece.color == piece.color:
+        board = self.board
+        for row, col in ADJACENT_CELLS[piece.row * 4 + piece.col // 2]:
+            neighbor_piece = board[row][col]
+            if neighbor_piece != 0 and neighbor_piece.color == piece.color:
                 return False  # Not a loner piece
         return True  # Loner piece
 
@@ -387,11 +449,11 @@ class Board:
     
     #detects a winning situation. A player wins when the opponent has no more pieces, or canno't move
     def is_winner(self, color):
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.get_piece(row, col)
-                if piece != 0 and piece.color != color and self.is_movable(piece):
-                    return False
+        board = self.board
+        for row, col in CELLS:
+            piece = board[row][col]
+            if piece != 0 and piece.color != color and self.is_movable(piece):
+                return False
         return True
 
     """
@@ -420,40 +482,21 @@ class Board:
         """
         Evaluates the current state of the checkers board for the given player.
 
-        Args:
-        - board: A list of lists representing the checkers board.
+        The features come from the incremental evaluation state (see checkers/evaluation.py),
+        features_22F computes the same list with a full scan of the board.
 
         Returns:
         - score: A float representing the score of the board for the given player.
         """
 
-        # Define some weights for the different features we will evaluate
-        pawn_weight = 4  # Weight for the number of pawns 1.5 2.5 4 
-        king_weight = 7.25  # Weight for the number of kings 2 4 7.25
-        distance_weight = 0.2  # Weight for the aggregated distance to promotion line
-        save_pawn_weight = 0.2  # Weight for saving pawns
-        save_king_weight = 0.4  # Weight for saving kings
-        attacking_pawn_weight = 0.1  # Weight for attacking pawns
-        central_pawn_weight = 0.3  # Weight for centrally positioned pawns
-        central_king_weight = 0.5  # Weight for centrally positioned kings
-        movable_pawn_weight = 0.1  # Weight for movable pawns
-        movable_king_weight = 0.2  # Weight for movable kings
-        unoccupied_promotion_weight = 0.4  # Weight for unoccupied fields on promotion line
-        defender_weight = 0.1  # Weight for defender pieces
-        main_diagonal_pawn_weight = 0.2  # Weight for pawns on the main diagonal
-        main_diagonal_king_weight = 0.3  # Weight for kings on the main diagonal
-        double_diagonal_pawn_weight = 0.1  # Weight for pawns on the double diagonal
-        double_diagonal_king_weight = 0.2  # Weight for kings on the double diagonal
-        loner_pawn_weight = 0.2  # Weight for loner pawns
-        loner_king_weight = 0.3  # Weight for loner kings
+        score = self.eval_state.score()
+        if self.eval_state.debug:
+            full = score_22F(self.features_22F())
+            assert abs(score - full) < 1e-9, "incremental evaluate_22F %s != full scan %s" % (score, full)
+        return score
 
-        #Boolean conditions
-        blitz_weight = 0.5 # Weight for a blitz situation
-        bridge_weight = 0.5 # Weight for a bridge situation
-        dog_weight = -0.5 # Weight for a dog situation
-        king_in_corner_weight = -0.5 # Weight for a king in corner situation
-        pawn_in_corner_weight = -0.3 # Weight for a pawn in corner situation
-        winning_weight = 10000 # Weight for a winning situation
+    #the 22 features of evaluate_22F, each one as WHITE minus RED, computed scanning the whole board
+    def features_22F(self):
 
         num_pawns = 0
         num_kings = 0
@@ -476,154 +519,44 @@ class Board:
 
         #Boolean conditions
         bridge_score = (1 if self.is_bridge(WHITE) else 0) - (1 if self.is_bridge(RED) else 0)
-        bridge_score *= bridge_weight
         dog_score = (1 if self.is_dog(RED) else 0) - (1 if self.is_dog(WHITE) else 0)
-        dog_score *= dog_weight
         king_in_corner_score = self.king_in_corner(RED) - self.king_in_corner(WHITE)
-        king_in_corner_score *= king_in_corner_weight
         pawn_in_corner_score = (1 if self.is_pawn_in_corner(RED) else 0) - (1 if self.is_pawn_in_corner(WHITE) else 0)
-        pawn_in_corner_score *= pawn_in_corner_weight
         winning_score = (1 if self.is_winner(WHITE) else 0) - (1 if self.is_winner(RED) else 0)
-        winning_score *= winning_weight
-
-
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.get_piece(row, col)
-                if piece != 0:  # not empty tile
-
-                    if piece.color == WHITE:    # AI piece
-                        num_pawns += 1
-                        if self.is_attacking_pawn(piece):
-                            attacking_pawn_score += 1
-                        if piece.king:  #king
-                            num_kings += 1
-                            if self.is_protected(piece):
-                                save_king_score += 1
-                            if row in [2,5] and col in [2,5]:
-                                central_king_score += 1
-                            if self.is_movable(piece):
-                                movable_king_score += 1
-                            if row == col:
-                                main_diagonal_king_score += 1
-                            if abs(row + col - 7) == 2:
-                                double_diagonal_king_score += 1
-                            if self.is_loner_piece(piece):
-                                loner_king_score -= 1
-                                
-                        else:   #pawn
-                            distance_score -= ROWS - 1 - row 
-                            if self.is_protected(piece):
-                                save_pawn_score += 1
-                            if row in [2,5] and col in [2,5]:
-                                central_pawn_score += 1
-                            if self.is_movable(piece):
-                                movable_pawn_score += 1
-                            if row == col:
-                                main_diagonal_pawn_score += 1
-                            if abs(row + col - 7) == 2:
-                                double_diagonal_pawn_score += 1
-                            if self.is_loner_piece(piece):
-                                loner_pawn_score -= 1
 
-                    elif piece.color == RED:    # player piece
-                        num_pawns -= 1
-                        if self.is_attacking_pawn(piece):
-                            attacking_pawn_score -= 1
-                        if piece.king:  #king
-                            num_kings -= 1
-                            if self.is_protected(piece):
-                                save_king_score -= 1
-                            if row in [2,5] and col in [2,5]:
-                                central_king_score -= 1
-                            if self.is_movable(piece):
-                                movable_king_score -= 1
-                            if row == col:
-                                main_diagonal_king_score -= 1
-                            if abs(row + col - 7) == 2:
-                                double_diagonal_king_score -= 1
-                            if self.is_loner_piece(piece):
-                                loner_king_score += 1
-                        else:   #pawn
-                            distance_score += row
-                            if self.is_protected(piece):
-                                save_pawn_score -= 1
-                            if row in [2,5] and col in [2,5]:
-                                central_pawn_score -= 1
-                            if self.is_movable(piece):
-                                movable_pawn_score -= 1
-                            if row == col:
-                                main_diagonal_pawn_score -= 1
-                            if abs(row + col - 7) == 2:
-                                double_diagonal_pawn_score -= 1
-                            if self.is_loner_piece(piece):
-                                loner_pawn_score += 1
-
-
-        # Calculate the score based on the number of pieces and kings
-        pawn_score = pawn_weight * num_pawns
-        king_score = king_weight * num_kings
-        score = pawn_score + king_score
-
-        # Calculate the score based on the aggregated distance to promotion line
-        distance_score *= distance_weight
-        score += distance_score
-
-        # Calculate the score based on saving pawns and kings
-        save_pawn_score *= save_pawn_weight
-        save_king_score *= save_king_weight
-        score += save_pawn_score + save_king_score
-
-        # Calculate the score based on attacking pawns
-        attacking_pawn_score *= attacking_pawn_weight
-        score += attacking_pawn_score
-
-        # Calculate the score based on centrally positioned pawns and kings
-        central_pawn_score *= central_pawn_weight
-        central_king_score *= central_king_weight
-        score += central_pawn_score + central_king_score
-
-        # Calculate the score based on movable pawns and kings
-        movable_pawn_score *= movable_pawn_weight
-        movable_king_score *= movable_king_weight
-        score += movable_pawn_score + movable_king_score
-
-        # Calculate the score based on unoccupied fields on promotion line
-        unoccupied_promotion_score *= unoccupied_promotion_weight
-        score += unoccupied_promotion_score
-
-        # Calculate the score based on defender pieces
-        defender_score *= defender_weight
-        score += defender_score
-
-        # Calculate the score based on pieces on the main diagonal
-        main_diagonal_pawn_score *= main_diagonal_pawn_weight
-        main_diagonal_king_score *= main_diagonal_king_weight
-        score += main_diagonal_pawn_score + main_diagonal_king_score
-
-        # Calculate the score based on pieces on the double diagonal
-        double_diagonal_pawn_score *= double_diagonal_pawn_weight
-        double_diagonal_king_score *= double_diagonal_king_weight
-        score += double_diagonal_pawn_score + double_diagonal_king_score
-
-        # Calculate the score based on loner pieces
-        loner_pawn_score *= loner_pawn_weight
-        loner_king_score *= loner_king_weight
-        score += loner_pawn_score + loner_king_score
-
-        # Calculate the score based on bridge situation
-        score += bridge_score
-
-        # Calculate the score based on dog situation
-        score += dog_score
-
-        # Calculate the score based on king in corner situation
-        score += king_in_corner_score
-
-        # Calculate the score based on king in corner situation
-        score += pawn_in_corner_score
-
-        # Calculate the score based on winning situation
-        score += winning_score
-
-        return score
+        for square, (row, col) in enumerate(CELLS):
+            piece = self.board[row][col]
+            if piece == 0:  # empty tile
+                continue
+            sign = 1 if piece.color == WHITE else -1    # AI piece counts for, player piece against
+            num_pawns += sign
+            if self.is_attacking_pawn(piece):
+                attacking_pawn_score += sign
+            protected = self.is_protected(piece)
+            central = square in CENTRAL_SQUARES
+            movable = self.is_movable(piece)
+            main_diagonal = square in MAIN_DIAGONAL_SQUARES
+            double_diagonal = square in DOUBLE_DIAGONAL_SQUARES
+            loner = self.is_loner_piece(piece)
+            if piece.king:  #king
+                num_kings += sign
+                save_king_score += sign if protected else 0
+                central_king_score += sign if central else 0
+                movable_king_score += sign if movable else 0
+                main_diagonal_king_score += sign if main_diagonal else 0
+                double_diagonal_king_score += sign if double_diagonal else 0
+                loner_king_score -= sign if loner else 0
+            else:   #pawn
+                distance_score += -(ROWS - 1 - row) if sign > 0 else row
+                save_pawn_score += sign if protected else 0
+                central_pawn_score += sign if central else 0
+                movable_pawn_score += sign if movable else 0
+                main_diagonal_pawn_score += sign if main_diagonal else 0
+                double_diagonal_pawn_score += sign if double_diagonal else 0
+                loner_pawn_score -= sign if loner else 0
+
+        return [num_pawns, num_kings, distance_score, save_pawn_score, save_king_score, attacking_pawn_score,
+                central_pawn_score, central_king_score, movable_pawn_score, movable_king_score,
+                unoccupied_promotion_score, defender_score, main_diagonal_pawn_score, main_diagonal_king_score,
+                double_diagonal_pawn_score, double_diagonal_king_score, loner_pawn_score, loner_king_score,
+                bridge_score, dog_score, king_in_corner_score, pawn_in_corner_score, winning_score]
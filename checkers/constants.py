@@ -1,4 +1,4 @@
-import pygame
+import os
 
 WIDTH, HEIGHT = 800, 800
 ROWS, COLS = 8, 8
@@ -12,4 +12,6 @@ BLUE = (0, 0, 255)
 GREY = (128, 128, 128)
 BEIGE = (232, 220, 202)
 
-CROWN = pygame.transform.scale(pygame.image.load('checkers/assets/crown.png'), (44, 25))
\ No newline at end of file
+# the crown image is loaded by Piece.draw the first time a king is drawn, importing this module needs no pygame
+CROWN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'crown.png')
+CROWN_SIZE = (44, 25)
@@ -0,0 +1,203 @@
+"""Features and weights of Board.evaluate_22F, and the state that updates them move by move."""
+
+from .constants import ROWS, RED, WHITE
+from .squares import CELLS, NEIGHBOR_CELLS, JUMP_CELLS, CENTRAL_SQUARES, MAIN_DIAGONAL_SQUARES, DOUBLE_DIAGONAL_SQUARES, \
+    DEFENDER_SQUARES
+
+(PAWNS, KINGS, DISTANCE, SAVE_PAWN, SAVE_KING, ATTACKING_PAWN, CENTRAL_PAWN, CENTRAL_KING,
+ MOVABLE_PAWN, MOVABLE_KING, UNOCCUPIED_PROMOTION, DEFENDER, MAIN_DIAGONAL_PAWN, MAIN_DIAGONAL_KING,
+ DOUBLE_DIAGONAL_PAWN, DOUBLE_DIAGONAL_KING, LONER_PAWN, LONER_KING,
+ BRIDGE, DOG, KING_IN_CORNER, PAWN_IN_CORNER, WINNING) = range(23)
+
+FEATURE_NAMES = ('pawn', 'king', 'distance', 'save_pawn', 'save_king', 'attacking_pawn', 'central_pawn', 'central_king',
+                 'movable_pawn', 'movable_king', 'unoccupied_promotion', 'defender', 'main_diagonal_pawn', 'main_diagonal_king',
+                 'double_diagonal_pawn', 'double_diagonal_king', 'loner_pawn', 'loner_king',
+                 'bridge', 'dog', 'king_in_corner', 'pawn_in_corner', 'winning')
+
+WEIGHTS_22F = (
+    4,      # pawns 1.5 2.5 4
+    7.25,   # kings 2 4 7.25
+    0.2,    # aggregated distance to promotion line
+    0.2,    # saving pawns
+    0.4,    # saving kings
+    0.1,    # attacking pawns
+    0.3,    # centrally positioned pawns
+    0.5,    # centrally positioned kings
+    0.1,    # movable pawns
+    0.2,    # movable kings
+    0.4,    # unoccupied fields on promotion line
+    0.1,    # defender pieces
+    0.2,    # pawns on the main diagonal
+    0.3,    # kings on the main diagonal
+    0.1,    # pawns on the double diagonal
+    0.2,    # kings on the double diagonal
+    0.2,    # loner pawns
+    0.3,    # loner kings
+    0.5,    # bridge situation
+    -0.5,   # dog situation
+    -0.5,   # king in corner situation
+    -0.3,   # pawn in corner situation
+    10000,  # winning situation
+)
+
+def score_22F(features, weights=WEIGHTS_22F):
+    """Weighted sum of the 22F features, added up in the same order as the original evaluate_22F."""
+    f, w = features, weights
+    score = w[PAWNS] * f[PAWNS] + w[KINGS] * f[KINGS]
+    score += f[DISTANCE] * w[DISTANCE]
+    score += f[SAVE_PAWN] * w[SAVE_PAWN] + f[SAVE_KING] * w[SAVE_KING]
+    score += f[ATTACKING_PAWN] * w[ATTACKING_PAWN]
+    score += f[CENTRAL_PAWN] * w[CENTRAL_PAWN] + f[CENTRAL_KING] * w[CENTRAL_KING]
+    score += f[MOVABLE_PAWN] * w[MOVABLE_PAWN] + f[MOVABLE_KING] * w[MOVABLE_KING]
+    score += f[UNOCCUPIED_PROMOTION] * w[UNOCCUPIED_PROMOTION]
+    score += f[DEFENDER] * w[DEFENDER]
+    score += f[MAIN_DIAGONAL_PAWN] * w[MAIN_DIAGONAL_PAWN] + f[MAIN_DIAGONAL_KING] * w[MAIN_DIAGONAL_KING]
+    score += f[DOUBLE_DIAGONAL_PAWN] * w[DOUBLE_DIAGONAL_PAWN] + f[DOUBLE_DIAGONAL_KING] * w[DOUBLE_DIAGONAL_KING]
+    score += f[LONER_PAWN] * w[LONER_PAWN] + f[LONER_KING] * w[LONER_KING]
+    score += f[BRIDGE] * w[BRIDGE]
+    score += f[DOG] * w[DOG]
+    score += f[KING_IN_CORNER] * w[KING_IN_CORNER]
+    score += f[PAWN_IN_CORNER] * w[PAWN_IN_CORNER]
+    score += f[WINNING] * w[WINNING]
+    return score
+
+# extra counters kept by EvalState after the features, for the winning feature
+WHITE_MOVABLE, RED_MOVABLE = len(FEATURE_NAMES), len(FEATURE_NAMES) + 1
+
+# squares whose per piece features can change when (row, col) changes: the predicates
+# (is_protected, is_movable, is_attacking_pawn, is_loner_piece) look at most two steps away on a diagonal
+AFFECTED = {cell: [cell] + [near for near in NEIGHBOR_CELLS[square] + JUMP_CELLS[square] if near is not None]
+            for square, cell in enumerate(CELLS)}
+
+# squares read by is_bridge, is_dog, king_in_corner and is_pawn_in_corner
+PATTERN_SQUARES = {(7, 2), (7, 6), (0, 1), (0, 5), (6, 7), (1, 0), (0, 7), (7, 0)}
+
+def piece_features(board, piece):
+    """What one piece adds to the feature list, as a tuple of (feature index, value) pairs."""
+    row = piece.row
+    square = row * 4 + piece.col // 2
+    white = piece.color == WHITE
+    sign = 1 if white else -1
+    features = [(PAWNS, sign)]
+    if board.is_attacking_pawn(piece):
+        features.append((ATTACKING_PAWN, sign))
+    movable = board.is_movable(piece)
+    if movable:
+        features.append((WHITE_MOVABLE if white else RED_MOVABLE, 1))
+    if square in DEFENDER_SQUARES[piece.color]:
+        features.append((DEFENDER, sign))
+    if piece.king:
+        features.append((KINGS, sign))
+        king_or_pawn = (SAVE_KING, CENTRAL_KING, MOVABLE_KING, MAIN_DIAGONAL_KING, DOUBLE_DIAGONAL_KING, LONER_KING)
+    else:
+        features.append((DISTANCE, -(ROWS - 1 - row) if white else row))
+        king_or_pawn = (SAVE_PAWN, CENTRAL_PAWN, MOVABLE_PAWN, MAIN_DIAGONAL_PAWN, DOUBLE_DIAGONAL_PAWN, LONER_PAWN)
+    save, central, mobile, main_diagonal, double_diagonal, loner = king_or_pawn
+    if board.is_protected(piece):
+        features.append((save, sign))
+    if square in CENTRAL_SQUARES:
+        features.append((central, sign))
+    if movable:
+        features.append((mobile, sign))
+    if square in MAIN_DIAGONAL_SQUARES:
+        features.append((main_diagonal, sign))
+    if square in DOUBLE_DIAGONAL_SQUARES:
+        features.append((double_diagonal, sign))
+    if board.is_loner_piece(piece):
+        features.append((loner, -sign))
+    return tuple(features)
+
+def pattern_features(board):
+    """bridge, dog, king in corner and pawn in corner, as in Board.evaluate_22F"""
+    return ((1 if board.is_bridge(WHITE) else 0) - (1 if board.is_bridge(RED) else 0),
+            (1 if board.is_dog(RED) else 0) - (1 if board.is_dog(WHITE) else 0),
+            board.king_in_corner(RED) - board.king_in_corner(WHITE),
+            (1 if board.is_pawn_in_corner(RED) else 0) - (1 if board.is_pawn_in_corner(WHITE) else 0))
+
+class EvalState:
+    """
+    evaluate_22F features of a Board, kept up to date by Board.move/Board.remove.
+
+    Each piece's contribution is cached. A change on a square only recomputes the pieces
+    within two diagonal steps of it (the reach of the tactical predicates), and the pattern
+    flags only when one of their squares changed. Between push() and pop() every change is
+    journaled, so Board.unmake_move restores the state without recomputing anything.
+
+    With debug set (EvalState.debug = True for every board) Board.evaluate_22F checks each
+    incremental score against a full rescan.
+    """
+    debug = False
+
+    def __init__(self, board):
+        self.board = board
+        self.contributions = {}
+        self.totals = [0] * (len(FEATURE_NAMES) + 2)
+        self.patterns = pattern_features(board)
+        self.frames = []
+        self.journal = []
+        for square in AFFECTED:
+            piece = board.board[square[0]][square[1]]
+            if piece != 0:
+                contribution = piece_features(board, piece)
+                self.contributions[square] = contribution
+                for feature, value in contribution:
+                    self.totals[feature] += value
+
+    def update(self, squares):
+        """Recomputes what depends on `squares`, after the pieces on them changed."""
+        grid = self.board.board
+        totals = self.totals
+        journal = self.journal if self.frames else None
+        seen = set()
+        for square in squares:
+            for affected in AFFECTED[square]:
+                if affected in seen:
+                    continue
+                seen.add(affected)
+                piece = grid[affected[0]][affected[1]]
+                old = self.contributions.get(affected)
+                new = piece_features(self.board, piece) if piece != 0 else None
+                if old == new:
+                    continue
+                if journal is not None:
+                    journal.append((affected, old))
+                if old is not None:
+                    for feature, value in old:
+                        totals[feature] -= value
+                if new is not None:
+                    for feature, value in new:
+                        totals[feature] += value
+                    self.contributions[affected] = new
+                else:
+                    del self.contributions[affected]
+            if square in PATTERN_SQUARES:
+                if journal is not None:
+                    journal.append((None, self.patterns))
+                self.patterns = pattern_features(self.board)
+
+    def push(self):
+        self.frames.append((len(self.journal), list(self.totals)))
+
+    def pop(self):
+        mark, totals = self.frames.pop()
+        journal = self.journal
+        while len(journal) > mark:
+            square, old = journal.pop()
+            if square is None:
+                self.patterns = old
+            elif old is None:
+                del self.contributions[square]
+            else:
+                self.contributions[square] = old
+        self.totals = totals
+
+    def features(self):
+        totals = self.totals
+        features = totals[:len(FEATURE_NAMES)]
+        features[BRIDGE], features[DOG], features[KING_IN_CORNER], features[PAWN_IN_CORNER] = self.patterns
+        #is_winner(color): no piece of the other color can move
+        features[WINNING] = (0 if totals[RED_MOVABLE] else 1) - (0 if totals[WHITE_MOVABLE] else 1)
+        return features
+
+    def score(self, weights=WEIGHTS_22F):
+        return score_22F(self.features(), weights)
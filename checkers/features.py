@@ -0,0 +1,307 @@
+"""
+The evaluate_22F features of a BitBoard one at a time, to switch them off, reweight them and time them:
+
+    python -m checkers.features --positions 2000 [--config eval.json] [--board]
+"""
+
+import argparse
+import json
+import random
+import time
+from .constants import ROWS, RED, WHITE
+from .board import Board
+from .bitboard import BitBoard, ROW_MASKS, CENTRAL, WHITE_DEFENDER_ROWS, RED_DEFENDER_ROWS, MAIN_DIAGONAL, DOUBLE_DIAGONAL, \
+    square_of
+from .evaluation import FEATURE_NAMES, WEIGHTS_22F, score_22F
+
+# masks shared by several features, computed once per evaluation when a feature needs them
+TERMS = {
+    'movable': BitBoard._movable,       # (white movable, red movable, white attacking, red attacking)
+    'protected': BitBoard._protected,
+    'loners': BitBoard._loners,         # (white loners, red loners)
+}
+
+def _count(position, bits):
+    return (position.white & bits).bit_count() - (position.red & bits).bit_count()
+
+def _count_pawns(position, bits):
+    return (position.white & ~position.kings & bits).bit_count() - (position.red & ~position.kings & bits).bit_count()
+
+def _count_kings(position, bits):
+    return (position.white & position.kings & bits).bit_count() - (position.red & position.kings & bits).bit_count()
+
+def _distance(position, terms):
+    white_pawns, red_pawns = position.white & ~position.kings, position.red & ~position.kings
+    score = 0
+    for row in range(ROWS):
+        score += (red_pawns & ROW_MASKS[row]).bit_count() * row
+        score -= (white_pawns & ROW_MASKS[row]).bit_count() * (ROWS - 1 - row)
+    return score
+
+def _has(bits, row, col):
+    return bool(bits >> square_of(row, col) & 1)
+
+def _king_in_corner(position, bits):
+    kings = bits & position.kings
+    if _has(kings, 0, 7):
+        return 2 if _has(kings, 7, 0) else 1
+    return 0
+
+def _movable_count(position, terms, pawns):
+    white_movable, red_movable, _, _ = terms['movable']
+    kind = ~position.kings if pawns else position.kings
+    return (white_movable & kind).bit_count() - (red_movable & kind).bit_count()
+
+def _loner_count(position, terms, pawns):
+    white_loners, red_loners = terms['loners']
+    kind = ~position.kings if pawns else position.kings
+    return (red_loners & kind).bit_count() - (white_loners & kind).bit_count()
+
+# name -> (terms it needs, function(position, terms) -> WHITE minus RED), same values as BitBoard.evaluate_22F
+FEATURES = {
+    'pawn': ((), lambda p, t: p.white.bit_count() - p.red.bit_count()),
+    'king': ((), lambda p, t: _count(p, p.kings)),
+    'distance': ((), _distance),
+    'save_pawn': (('protected',), lambda p, t: _count_pawns(p, t['protected'])),
+    'save_king': (('protected',), lambda p, t: _count_kings(p, t['protected'])),
+    'attacking_pawn': (('movable',), lambda p, t: t['movable'][2].bit_count() - t['movable'][3].bit_count()),
+    'central_pawn': ((), lambda p, t: _count_pawns(p, CENTRAL)),
+    'central_king': ((), lambda p, t: _count_kings(p, CENTRAL)),
+    'movable_pawn': (('movable',), lambda p, t: _movable_count(p, t, True)),
+    'movable_king': (('movable',), lambda p, t: _movable_count(p, t, False)),
+    'unoccupied_promotion': ((), lambda p, t: 0),      # white minus white in Board.evaluate_22F
+    'defender': ((), lambda p, t: (p.white & WHITE_DEFENDER_ROWS).bit_count() - (p.red & RED_DEFENDER_ROWS).bit_count()),
+    'main_diagonal_pawn': ((), lambda p, t: _count_pawns(p, MAIN_DIAGONAL)),
+    'main_diagonal_king': ((), lambda p, t: _count_kings(p, MAIN_DIAGONAL)),
+    'double_diagonal_pawn': ((), lambda p, t: _count_pawns(p, DOUBLE_DIAGONAL)),
+    'double_diagonal_king': ((), lambda p, t: _count_kings(p, DOUBLE_DIAGONAL)),
+    'loner_pawn': (('loners',), lambda p, t: _loner_count(p, t, True)),
+    'loner_king': (('loners',), lambda p, t: _loner_count(p, t, False)),
+    'bridge': ((), lambda p, t: (1 if _has(p.white, 0, 1) and _has(p.white, 0, 5) else 0) -
+                                (1 if _has(p.red, 7, 2) and _has(p.red, 7, 6) else 0)),
+    'dog': ((), lambda p, t: (1 if _has(p.white, 6, 7) and _has(p.red, 7, 6) else 0) -
+                             (1 if _has(p.white, 0, 1) and _has(p.red, 1, 0) else 0)),
+    'king_in_corner': ((), lambda p, t: _king_in_corner(p, p.red) - _king_in_corner(p, p.white)),
+    'pawn_in_corner': ((), lambda p, t: (1 if _has(p.red, 7, 0) else 0) - (1 if _has(p.white, 0, 7) else 0)),
+    'winning': (('movable',), lambda p, t: (0 if t['movable'][1] else 1) - (0 if t['movable'][0] else 1)),
+}
+
+class EvalConfig:
+    """
+    Which evaluate_22F features count, and with which weight.
+
+    Args:
+    - weights: {feature name: weight} replacing the weights of WEIGHTS_22F.
+    - disabled: feature names left out, they are not computed at all on a BitBoard.
+    """
+
+    def __init__(self, weights=None, disabled=()):
+        weights = dict(weights or {})
+        for name in list(weights) + list(disabled):
+            if name not in FEATURES:
+                raise ValueError("unknown feature %r" % name)
+        self.disabled = frozenset(disabled)
+        self.weights = tuple(0 if name in self.disabled else weights.get(name, default)
+                             for name, default in zip(FEATURE_NAMES, WEIGHTS_22F))
+
+    @classmethod
+    def load(cls, path):
+        """EvalConfig of a JSON file {"weights": {...}, "disabled": [...]}."""
+        with open(path) as file:
+            data = json.load(file)
+        return cls(data.get('weights'), data.get('disabled', ()))
+
+    def is_default(self):
+        return self.weights == WEIGHTS_22F
+
+    def enabled(self):
+        """Names of the features that count (a weight of 0 disables a feature too)."""
+        return [name for name, weight in zip(FEATURE_NAMES, self.weights) if weight != 0]
+
+    def evaluator(self, profile=None):
+        """
+        function(position) -> score for the search (iterative_search's evaluator).
+
+        BitBoard.evaluate_22F itself with the default weights and no profile. A Board is scored
+        from its incremental features with these weights, disabling saves no time there.
+        """
+        if self.is_default() and profile is None:
+            return _evaluate_22F
+        return FeatureEvaluator(self, profile)
+
+    def __repr__(self):
+        changed = {name: weight for name, weight, default in zip(FEATURE_NAMES, self.weights, WEIGHTS_22F)
+                   if weight != default and name not in self.disabled}
+        return 'EvalConfig(weights=%s, disabled=%s)' % (changed, sorted(self.disabled))
+
+def _evaluate_22F(position):
+    return position.evaluate_22F()
+
+class EvalProfile:
+    """Cumulative calls and seconds per feature and per shared term, filled in by a profiling FeatureEvaluator."""
+
+    def __init__(self):
+        self.calls = {}
+        self.seconds = {}
+
+    def add(self, name, seconds):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def rows(self):
+        """[(name, calls, seconds, microseconds per call)], the most expensive first."""
+        return sorted(((name, self.calls[name], self.seconds[name], self.seconds[name] / self.calls[name] * 1e6)
+                       for name in self.calls), key=lambda row: -row[2])
+
+    def report(self, config=None):
+        """Text table of the profile, with the weights of `config`."""
+        weights = dict(zip(FEATURE_NAMES, (config or EvalConfig()).weights))
+        total = sum(self.seconds.values()) or 1.0
+        lines = ['%-22s %8s %10s %9s %10s %6s' % ('feature', 'weight', 'calls', 'ms', 'us/call', 'share')]
+        for name, calls, seconds, per_call in self.rows():
+            weight = '%g' % weights[name] if name in weights else ('shared' if name in TERMS else '-')
+            lines.append('%-22s %8s %10d %9.1f %10.2f %5.1f%%' % (name, weight, calls, seconds * 1000, per_call,
+                                                                  100 * seconds / total))
+        return '\n'.join(lines)
+
+class FeatureEvaluator:
+    """
+    evaluate_22F of an EvalConfig: the enabled features and the terms they need, nothing else.
+
+    With a profile every term and feature is timed on its own, which is slower: compare the
+    features with each other, not with the search without profile.
+    """
+
+    def __init__(self, config, profile=None):
+        self.config = config
+        self.profile = profile
+        self.features = [(name, FEATURES[name][1], weight) for name, weight in zip(FEATURE_NAMES, config.weights) if weight != 0]
+        needed = {term for name, _, _ in self.features for term in FEATURES[name][0]}
+        self.terms = [(term, function) for term, function in TERMS.items() if term in needed]
+
+    def __call__(self, position):
+        if not isinstance(position, BitBoard):
+            return score_22F(position.eval_state.features(), self.config.weights)
+        if self.profile is not None:
+            return self._profiled(position)
+        analysis = position.analysis()
+        terms = {term: analysis.term(term, function) for term, function in self.terms}
+        score = 0
+        for _, function, weight in self.features:
+            score += weight * function(position, terms)
+        return score
+
+    def _profiled(self, position):
+        clock, profile = time.perf_counter, self.profile
+        terms = {}
+        for term, function in self.terms:
+            start = clock()
+            terms[term] = function(position)
+            profile.add(term, clock() - start)
+        score = 0
+        for name, function, weight in self.features:
+            start = clock()
+            score += weight * function(position, terms)
+            profile.add(name, clock() - start)
+        return score
+
+# Board predicates -> the features they compute (is_winner runs is_movable over the board)
+PREDICATES = {
+    'is_winner': ('winning',),
+    'is_movable': ('movable_pawn', 'movable_king', 'winning'),
+    'is_protected': ('save_pawn', 'save_king'),
+    'is_attacking_pawn': ('attacking_pawn',),
+    'is_loner_piece': ('loner_pawn', 'loner_king'),
+    'count_defender_pieces': ('defender',),
+    'count_unoccupied_promotion_tiles': ('unoccupied_promotion',),
+    'is_bridge': ('bridge',),
+    'is_dog': ('dog',),
+    'king_in_corner': ('king_in_corner',),
+    'is_pawn_in_corner': ('pawn_in_corner',),
+}
+
+def profile_board(boards, profile):
+    """
+    Runs Board.features_22F on every board with each predicate of PREDICATES timed into `profile`.
+
+    Times are inclusive: is_winner contains the is_movable calls it makes.
+
+    Returns:
+    - seconds spent in features_22F, the predicates included.
+    """
+    originals = {name: getattr(Board, name) for name in PREDICATES}
+
+    def timed(name, function):
+        def wrapper(*args):
+            start = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                profile.add(name, time.perf_counter() - start)
+        return wrapper
+
+    for name, function in originals.items():
+        setattr(Board, name, timed(name, function))
+    start = time.perf_counter()
+    try:
+        for board in boards:
+            board.features_22F()
+        return time.perf_counter() - start
+    finally:
+        for name, function in originals.items():
+            setattr(Board, name, function)
+
+def sample_positions(count, seed=0, max_plies=80):
+    """`count` BitBoards met in random games from the standard setup."""
+    rng = random.Random(seed)
+    found = []
+    while len(found) < count:
+        position, color = BitBoard.initial(), RED
+        for _ in range(rng.randrange(max_plies)):
+            moves = position.get_all_moves(color)
+            if not moves or position.winner() is not None:
+                break
+            position.move(*rng.choice(moves))
+            color = WHITE if color == RED else RED
+        found.append(position)
+    return found
+
+def check(positions):
+    """Number of positions where every feature switched on with the default weights differs from BitBoard.evaluate_22F."""
+    evaluator = FeatureEvaluator(EvalConfig())
+    return sum(1 for position in positions if abs(evaluator(position) - position.evaluate_22F()) > 1e-6)
+
+def main():
+    parser = argparse.ArgumentParser(description="Time and call count of every evaluate_22F feature.")
+    parser.add_argument('--positions', type=int, default=2000, help="random positions to evaluate")
+    parser.add_argument('--config', default=None, help="JSON EvalConfig, every feature by default")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--board', action='store_true', help="profile the Board predicates instead")
+    args = parser.parse_args()
+    config = EvalConfig.load(args.config) if args.config else EvalConfig()
+    positions = sample_positions(args.positions, args.seed)
+    if args.board:
+        profile = EvalProfile()
+        seconds = profile_board([position.to_board() for position in positions], profile)
+        print(profile.report())
+        print("Board.features_22F: %.2f us per position" % (seconds / len(positions) * 1e6))
+        for name, features in PREDICATES.items():
+            print("%-34s %s" % (name, ', '.join(features)))
+        return
+    profile = EvalProfile()
+    evaluator = FeatureEvaluator(config, profile)
+    for position in positions:
+        evaluator(position)
+    print(profile.report(config))
+
+    #whole evaluation without the per feature clock reads
+    for name, function in (('BitBoard.evaluate_22F', _evaluate_22F), ('FeatureEvaluator', FeatureEvaluator(config))):
+        start = time.perf_counter()
+        for position in positions:
+            function(position)
+        print("%s: %.2f us per position" % (name, (time.perf_counter() - start) / len(positions) * 1e6))
+    wrong = check(positions)
+    print('features ok' if not wrong else '%d positions differ from evaluate_22F' % wrong)
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
-import pygame
+import time
 from .constants import RED, WHITE, BLUE, SQUARE_SIZE
 from checkers.board import Board
+from .move import Move
+from .pdn import new_game
 
 class Game:
     def __init__(self, win):
@@ -8,6 +10,7 @@ class Game:
         self.win = win
 
     def update(self):
+        import pygame
         self.board.draw(self.win)
         self.draw_valid_moves(self.valid_moves)
         pygame.display.update()
@@ -18,6 +21,9 @@ class Game:
         self.board = Board()
         self.turn = RED
         self.valid_moves = {}
+        #PDN record of the game (checkers/pdn.py), every move with its thinking time
+        self.record = new_game(self.board, self.turn)
+        self.turn_start = time.perf_counter()
 
     def reset(self):
         self._init()
@@ -35,7 +41,9 @@ class Game:
         piece = self.board.get_piece(row, col)
         if piece != 0 and piece.color == self.turn:
             self.selected = piece
-            self.valid_moves = self.board.get_valid_moves(piece)
+            #the moves of the side to move are generated once per position, the piece picks its own
+            self.valid_moves = {move.end: move.captured for move in self.board.analysis().moves(self.turn)
+                                if move.start == (row, col)}
             #print("piece: ", piece, " moves: ", self.valid_moves)
             return True
         
@@ -44,8 +52,10 @@ class Game:
     def _move(self, row, col): 
         piece = self.board.get_piece(row, col)
         if self.selected and piece == 0 and (row, col) in self.valid_moves:
-            self.board.move(self.selected, row, col)
             skipped = self.valid_moves[(row, col)]
+            self.record.add(Move((self.selected.row, self.selected.col), (row, col), skipped),
+                            seconds=time.perf_counter() - self.turn_start)
+            self.board.move(self.selected, row, col)
             if skipped:
                 self.board.remove(skipped)
             self.change_turn()
@@ -60,8 +70,10 @@ class Game:
             self.turn = WHITE
         else:
             self.turn = RED
+        self.turn_start = time.perf_counter()
 
     def draw_valid_moves(self, moves):
+        import pygame
         for move in moves:
             row, col = move
             pygame.draw.circle(self.win, BLUE, (col * SQUARE_SIZE + SQUARE_SIZE // 2, row * SQUARE_SIZE + SQUARE_SIZE // 2), 15)
@@ -70,7 +82,7 @@ class Game:
         self.valid_moves = {}
 
     def winner(self):
-        return self.board.winner()
+        return self.board.analysis().winner()
     
     def match_is_draw(self, piece):
         if len(self.board.get_valid_moves(piece)) == 0:
@@ -81,6 +93,18 @@ class Game:
     def get_board(self):
         return self.board
     
-    def ai_move(self, board): #returns the new updated board object
+    #move: the engine's Move, recorded with its score and thinking time when given
+    def ai_move(self, board, move=None, score=None, seconds=None): #returns the new updated board object
+        if move is not None:
+            self.record.add(move, score, seconds)
         self.board = board
         self.change_turn()
+
+    #the PDN record with the result: the side main.py ends the game for, or unfinished ("*") while the game goes on
+    def finish_record(self):
+        analysis = self.board.analysis()
+        winner = RED if analysis.is_winner(RED) else WHITE if analysis.is_winner(WHITE) else None
+        if winner is not None:
+            self.record.finish(winner)
+        return self.record
+
@@ -0,0 +1,18 @@
+class Move:
+    """A single move as the search plays it: where the piece starts and lands, the pieces
+    it captures and, once Board.make_move has applied it, whether it promoted the piece."""
+
+    def __init__(self, start, end, captured):
+        self.start = start          # (row, col)
+        self.end = end              # (row, col)
+        self.captured = captured    # list of Piece, as returned by Board.get_valid_moves
+        self.promoted = False
+
+    def __eq__(self, other):
+        return isinstance(other, Move) and self.start == other.start and self.end == other.end
+
+    def __hash__(self):
+        return hash((self.start, self.end))
+
+    def __repr__(self):
+        return 'Move(%s -> %s, captured=%d)' % (self.start, self.end, len(self.captured))
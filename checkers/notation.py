@@ -0,0 +1,132 @@
+"""
+Move notation ("9-14", "14x23") and position texts, squares are the cells 1-32 of the diagram in board.py.
+In PDN FEN "White" is RED and "Black" is WHITE.
+"""
+
+import re
+from .constants import RED, WHITE
+from .board import Board
+from .bitboard import BitBoard, square_of, iter_bits
+
+def move_to_text(move):
+    """Text of a BitBoard move tuple or of a Board Move."""
+    origin, destination = move_squares(move)
+    captured = move[2] if isinstance(move, tuple) else move.captured
+    return '%d%s%d' % (origin + 1, 'x' if captured else '-', destination + 1)
+
+def parse_squares(text):
+    """(origin, destination) squares (0-31) of a move text, ValueError if it is not one."""
+    separator = 'x' if 'x' in text else '-'
+    parts = text.strip().lower().split(separator)
+    if len(parts) < 2:
+        raise ValueError("not a move: %r" % text)
+    origin, destination = int(parts[0]) - 1, int(parts[-1]) - 1
+    if not (0 <= origin < 32 and 0 <= destination < 32):
+        raise ValueError("square out of range: %r" % text)
+    return origin, destination
+
+def move_squares(move):
+    """(origin, destination) squares of a BitBoard move tuple or of a Board Move."""
+    if isinstance(move, tuple):
+        return move[0], move[1]
+    return square_of(*move.start), square_of(*move.end)
+
+def find_move(position, origin, destination, color):
+    """The legal move of `color` in `position` (Board or BitBoard) from square `origin` to `destination`, None if there is none."""
+    for move in position.get_all_moves(color):
+        if move_squares(move) == (origin, destination):
+            return move
+    return None
+
+def parse_move(position, text, color):
+    """The legal move of `color` in `position` (Board or BitBoard) written as `text`, ValueError if there is none."""
+    move = find_move(position, *parse_squares(text), color)
+    if move is None:
+        raise ValueError("illegal move: %r" % text)
+    return move
+
+PIECE_CHARS = {(WHITE, False): 'w', (WHITE, True): 'W', (RED, False): 'r', (RED, True): 'R'}
+
+def position_to_text(position):
+    """32 chars (one per cell 1-32) of a BitBoard."""
+    chars = []
+    for square in range(32):
+        color = position.color_at(square)
+        chars.append(PIECE_CHARS[(color, bool(position.kings >> square & 1))] if color is not None else '.')
+    return ''.join(chars)
+
+def position_from_text(text):
+    """BitBoard of 32 chars as written by position_to_text, ValueError if malformed."""
+    if len(text) != 32:
+        raise ValueError("board needs 32 cells, got %d" % len(text))
+    white = red = kings = 0
+    for square, char in enumerate(text):
+        bit = 1 << square
+        if char in 'wW':
+            white |= bit
+        elif char in 'rR':
+            red |= bit
+        elif char != '.':
+            raise ValueError("bad cell %r" % char)
+        if char in 'WR':
+            kings |= bit
+    return BitBoard(white, red, kings)
+
+# PDN FEN letter -> color of this program, see the module docstring
+FEN_COLORS = {'W': RED, 'B': WHITE}
+FEN_LETTERS = {RED: 'W', WHITE: 'B'}
+
+_FEN_SQUARES = re.compile(r'^(K?)(\d+)(?:-(\d+))?$')
+
+def position_to_fen(position, color):
+    """PDN FEN of `position` (Board or BitBoard) with `color` to move, squares in increasing order."""
+    if isinstance(position, Board):
+        position = BitBoard.from_board(position)
+    fields = [FEN_LETTERS[color]]
+    for letter, bits in (('W', position.red), ('B', position.white)):
+        fields.append(letter + ','.join('%s%d' % ('K' if position.kings >> square & 1 else '', square + 1)
+                                        for square in iter_bits(bits)))
+    return ':'.join(fields)
+
+def position_from_fen(text, board=True):
+    """
+    (position, color to move) of a PDN FEN, ValueError if malformed.
+
+    Accepts what other programs write: a whole [FEN "..."] tag, lower case, ranges of squares
+    ("W21-32", a K before a range makes them all kings) and a final dot.
+
+    Args:
+    - board: return a Board, a BitBoard if False.
+    """
+    text = text.strip()
+    if text.startswith('['):
+        match = re.match(r'^\[\s*FEN\s+"([^"]*)"\s*\]$', text, re.IGNORECASE)
+        if match is None:
+            raise ValueError("not a FEN tag: %r" % text)
+        text = match.group(1).strip()
+    fields = [field.strip() for field in text.upper().rstrip('.').split(':')]
+    if len(fields) < 2 or fields[0] not in FEN_COLORS:
+        raise ValueError("not a FEN: %r" % text)
+    pieces = {RED: 0, WHITE: 0}
+    kings = 0
+    for field in fields[1:]:
+        if not field or field[0] not in FEN_COLORS:
+            raise ValueError("bad FEN field %r" % field)
+        color = FEN_COLORS[field[0]]
+        for item in filter(None, (item.strip() for item in field[1:].split(','))):
+            match = _FEN_SQUARES.match(item)
+            if match is None:
+                raise ValueError("bad FEN square %r" % item)
+            king, first = match.group(1), int(match.group(2))
+            last = int(match.group(3)) if match.group(3) else first
+            if not 1 <= first <= last <= 32:
+                raise ValueError("square out of range: %r" % item)
+            for square in range(first - 1, last):
+                bit = 1 << square
+                if (pieces[RED] | pieces[WHITE]) & bit:
+                    raise ValueError("square %d given twice" % (square + 1))
+                pieces[color] |= bit
+                if king:
+                    kings |= bit
+    position = BitBoard(pieces[WHITE], pieces[RED], kings)
+    return (position.to_board() if board else position), FEN_COLORS[fields[0]]
@@ -0,0 +1,308 @@
+"""
+PDN game records, read and written one game at a time. PDN White is RED, PDN Black is WHITE
+(checkers/notation.py); scores and times go in the move comments as [%eval S] [%emt SECONDS].
+"""
+
+import re
+from .constants import RED, WHITE
+from .board import Board
+from .notation import move_to_text, parse_move, position_to_fen, position_from_fen
+from .snapshot import Snapshot
+
+# result tags, English draughts and international draughts style
+RESULTS = {'1-0': RED, '2-0': RED, '0-1': WHITE, '0-2': WHITE, '1/2-1/2': None, '1-1': None, '*': None}
+RESULT_OF = {RED: '1-0', WHITE: '0-1', None: '1/2-1/2'}
+STANDARD_START = 'B:W21-32:B1-12'
+GAME_TYPE = '21'    # PDN GameType of English draughts / American checkers
+LINE_WIDTH = 80
+
+_TAG = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+_TOKEN = re.compile(r'(?P<result>1-0|0-1|2-0|0-2|1/2-1/2|1-1|\*)(?=\s|$|[({])'
+                    r'|(?P<number>\d+\.(?:\.\.)?)'
+                    r'|(?P<move>\d+(?:[-x]\d+)+)[!?]*'
+                    r'|(?P<nag>\$\d+)'
+                    r'|(?P<open>\()|(?P<close>\))'
+                    r'|(?P<other>[^\s(){]+)')
+_EVAL = re.compile(r'\[%eval\s+([-+]?[\d.]+)\]')
+_EMT = re.compile(r'\[%emt\s+([\d.]+)\]')
+
+class PdnError(ValueError):
+    """A game that cannot be read or replayed, with the line of the input where it starts."""
+
+    def __init__(self, message, line=0):
+        super().__init__('line %d: %s' % (line, message) if line else message)
+        self.line = line
+
+class PdnGame:
+    """
+    One game: its tags, its moves as written, and per move the engine score and the thinking time.
+
+    Args:
+    - tags: PDN tags (Event, White, Black, FEN...), in the order they are written.
+    - start: FEN of the first position, the FEN tag or the standard setup when None.
+    """
+
+    def __init__(self, tags=None, start=None):
+        self.tags = dict(tags or {})
+        if start is not None:
+            self.tags['FEN'] = start
+        self.moves = []         # move texts ("9-14", "22x15")
+        self.scores = []        # engine score after each move, None when unknown
+        self.times = []         # seconds spent on each move, None when unknown
+        self.comments = []      # the rest of the comment after each move, '' when none
+        self.result = self.tags.get('Result', '*')
+        self.line = 0           # line of the input the game starts on, 0 when not read from a file
+        self.error = None       # why read_games found the game invalid, None when it replays
+
+    def add(self, move, score=None, seconds=None, comment=''):
+        """Appends a move: text, Board Move or BitBoard move tuple."""
+        self.moves.append(move if isinstance(move, str) else move_to_text(move))
+        self.scores.append(score)
+        self.times.append(seconds)
+        self.comments.append(comment)
+
+    def finish(self, winner):
+        """Sets the result from the winner (RED, WHITE, or None for a draw)."""
+        self.result = RESULT_OF[winner]
+
+    def winner(self):
+        """RED, WHITE, or None for a draw or an unfinished game."""
+        return RESULTS.get(self.result)
+
+    def start(self):
+        """(Board, color to move) before the first move."""
+        return position_from_fen(self.tags.get('FEN', STANDARD_START))
+
+    def replay(self):
+        """
+        Plays the moves on a Board: yields (Snapshot, Board Move) before every move, then (final Snapshot, None).
+
+        Raises PdnError at the first move that is not legal.
+        """
+        for board, color, move in self._play():
+            yield Snapshot.of(board, color), move
+
+    def _play(self):
+        # (board, color to move, Move) before every move and (board, color, None) at the end, one Board moved along
+        try:
+            board, color = self.start()
+        except ValueError as error:
+            raise PdnError("bad FEN: %s" % error, self.line)
+        for ply, text in enumerate(self.moves):
+            try:
+                move = parse_move(board, text, color)
+            except ValueError as error:
+                raise PdnError("move %d (%s): %s" % (ply // 2 + 1, text, error), self.line)
+            yield board, color, move
+            board.make_move(move)
+            color = WHITE if color == RED else RED
+        yield board, color, None
+
+    def __repr__(self):
+        return 'PdnGame(%s vs %s, %d moves, %s)' % (self.tags.get('White', '?'), self.tags.get('Black', '?'),
+                                                   len(self.moves), self.result)
+
+def _tokens(lines):
+    # (kind, text, line number) of a PDN stream, comments may run over several lines
+    comment, comment_line = None, 0
+    for number, line in enumerate(lines, 1):
+        if comment is None and line.startswith('%'):
+            continue    # escape line
+        position = 0
+        while position < len(line):
+            if comment is not None:
+                end = line.find('}', position)
+                if end < 0:
+                    comment.append(line[position:])
+                    break
+                comment.append(line[position:end])
+                yield 'comment', ''.join(comment).strip(), comment_line
+                comment, position = None, end + 1
+                continue
+            char = line[position]
+            if char.isspace():
+                position += 1
+            elif char == '{':
+                comment, comment_line, position = [], number, position + 1
+            elif char == '[':
+                match = _TAG.match(line, position)
+                if match is None:
+                    yield 'error', "bad tag %r" % line.strip(), number
+                    break
+                yield 'tag', (match.group(1), match.group(2).replace('\\"', '"').replace('\\\\', '\\')), number
+                position = match.end()
+            elif char == ';':
+                break       # comment to the end of the line
+            else:
+                match = _TOKEN.match(line, position)
+                yield match.lastgroup, match.group(match.lastgroup), number
+                position = match.end()
+    if comment is not None:
+        yield 'error', "unterminated comment", comment_line
+
+def _parse(lines):
+    # PdnGames of a PDN stream, tags and moves only, game.error set when the text itself is wrong
+    game, variation = None, 0
+    for kind, text, number in _tokens(lines):
+        if kind == 'tag':
+            #tags after moves: a new game, the previous one had no result
+            if game is not None and game.moves:
+                yield game
+                game = None
+            if game is None:
+                game, variation = PdnGame(), 0
+                game.line = number
+            game.tags[text[0]] = text[1]
+            if text[0] == 'Result':
+                game.result = text[1]
+            continue
+        if game is None:
+            game, variation = PdnGame(), 0
+            game.line = number
+        if kind == 'open':
+            variation += 1
+        elif kind == 'close':
+            variation = max(0, variation - 1)
+        elif variation:
+            continue        # alternative lines are not part of the game
+        elif kind == 'move':
+            game.add(text)
+        elif kind == 'comment':
+            if game.moves:
+                _annotate(game, text)
+        elif kind == 'result':
+            game.result = text
+            yield game
+            game = None
+        elif kind in ('other', 'error') and game.error is None:
+            game.error = str(PdnError(text if kind == 'error' else "unexpected %r" % text, number))
+    if game is not None and (game.moves or game.tags):
+        yield game
+
+def _annotate(game, text):
+    # [%eval S] [%emt SECONDS] of the comment go to the last move, the rest stays a comment
+    score, seconds = _EVAL.search(text), _EMT.search(text)
+    if score is not None:
+        game.scores[-1] = float(score.group(1))
+    if seconds is not None:
+        game.times[-1] = float(seconds.group(1))
+    rest = _EMT.sub('', _EVAL.sub('', text)).strip()
+    if rest:
+        game.comments[-1] = (game.comments[-1] + ' ' + rest).strip()
+
+def read_games(lines, validate=True, strict=False):
+    """
+    PdnGames of `lines` (an open file or any iterable of lines), one at a time.
+
+    Only the game being read is kept in memory, a collection of any size streams through.
+
+    Args:
+    - validate: replay every game through Board, game.error tells why a game does not replay.
+    - strict: raise PdnError on the first invalid game (text or moves) instead.
+    """
+    for game in _parse(lines):
+        if validate and game.error is None:
+            try:
+                for _ in game._play():
+                    pass
+            except PdnError as error:
+                game.error = str(error)
+        if strict and game.error is not None:
+            raise PdnError(game.error)
+        yield game
+
+def read_positions(lines):
+    """(Snapshot, move text or None after the last move, winner of the game) of every position of the valid games of `lines`."""
+    for game in read_games(lines, validate=False):
+        if game.error is not None:
+            continue
+        try:
+            replayed = list(game.replay())
+        except PdnError:
+            continue
+        winner = game.winner()
+        for (snapshot, _), text in zip(replayed, game.moves + [None]):
+            yield snapshot, text, winner
+
+def _quote(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+def format_game(game):
+    """PDN text of `game`, ending with an empty line."""
+    tags = {'Event': '?', 'Site': '?', 'Date': '????.??.??', 'Round': '?', 'White': '?', 'Black': '?'}
+    tags.update(game.tags)
+    tags['Result'] = game.result
+    tags.setdefault('GameType', GAME_TYPE)
+    lines = ['[%s "%s"]' % (name, _quote(value)) for name, value in tags.items()]
+
+    #PDN numbers the moves from Black's (WHITE's) first one
+    _, color = game.start()
+    words, number = [], 1
+    for ply, text in enumerate(game.moves):
+        if color == WHITE:
+            words.append('%d.' % number)
+        elif ply == 0:
+            words.append('%d...' % number)
+        words.append(text)
+        notes = []
+        if game.scores[ply] is not None:
+            notes.append('[%%eval %.3f]' % game.scores[ply])
+        if game.times[ply] is not None:
+            notes.append('[%%emt %.3f]' % game.times[ply])
+        if game.comments[ply]:
+            notes.append(game.comments[ply].replace('}', ')'))
+        if notes:
+            words.append('{%s}' % ' '.join(notes))
+        if color == RED:
+            number += 1
+        color = WHITE if color == RED else RED
+    words.append(game.result)
+
+    movetext, line = [], ''
+    for word in words:
+        if line and len(line) + 1 + len(word) > LINE_WIDTH:
+            movetext.append(line)
+            line = word
+        else:
+            line = line + ' ' + word if line else word
+    movetext.append(line)
+    return '\n'.join(lines) + '\n\n' + '\n'.join(movetext) + '\n\n'
+
+def write_game(file, game):
+    """Appends `game` to the open text `file` as PDN."""
+    file.write(format_game(game))
+    file.flush()
+
+def new_game(position, color, **tags):
+    """Empty PdnGame starting from `position` (Board or BitBoard) with `color` to move, tags given as keywords."""
+    return PdnGame(tags, start=position_to_fen(position, color))
+
+def check(count=20, seed=0):
+    """Writes `count` random games with scores and times, reads them back and compares: number of games that differ."""
+    import io
+    import random
+    rng = random.Random(seed)
+    bad = 0
+    for index in range(count):
+        board, color = Board(), RED if index % 2 else WHITE
+        game = new_game(board, color, Event='check', Round=index + 1)
+        for _ in range(rng.randrange(1, 120)):
+            moves = board.analysis().moves(color)
+            if not moves or board.winner() is not None:
+                break
+            move = rng.choice(moves)
+            game.add(move, round(rng.uniform(-5, 5), 3), round(rng.uniform(0, 2), 3), rng.choice(('', 'a {note}')))
+            board.make_move(move)
+            color = WHITE if color == RED else RED
+        game.finish(rng.choice((RED, WHITE, None)))
+        text = format_game(game)
+        read = list(read_games(io.StringIO(text).readlines()))
+        comments = [comment.replace('}', ')') for comment in game.comments]
+        if len(read) != 1 or read[0].error is not None or read[0].moves != game.moves or read[0].scores != game.scores \
+                or read[0].times != game.times or read[0].comments != comments or read[0].result != game.result:
+            bad += 1
+    return bad
+
+if __name__ == '__main__':
+    bad = check()
+    print("pdn ok" if not bad else "pdn: %d games differ" % bad)
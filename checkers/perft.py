@@ -0,0 +1,91 @@
+"""
+Leaf counts of the move tree to a fixed depth, the regression check of the move generators:
+
+    python -m checkers.perft [--bitboard]
+"""
+
+import argparse
+import time
+from .constants import RED, WHITE
+from .notation import position_from_text, move_to_text
+
+# (name, position, side to move, {depth: leaf nodes})
+REFERENCE = [
+    ('initial', 'wwwwwwwwwwww........rrrrrrrrrrrr', RED,
+     {1: 7, 2: 49, 3: 379, 4: 2872, 5: 23582, 6: 190647, 7: 1607272}),
+    ('kings 2 v 2', 'W.......W...............R......R', WHITE,
+     {1: 6, 2: 36, 3: 156, 4: 806, 5: 4808, 6: 27709, 7: 142022}),
+    ('kings 3 v 1', '.W...W.......W..........R.......', RED,
+     {1: 4, 2: 32, 3: 72, 4: 564, 5: 2220, 6: 18718, 7: 49907}),
+    ('pawn triple jump', '....www.....rww....r.w..wr......', RED,
+     {1: 7, 2: 70, 3: 303, 4: 2714, 5: 11560, 6: 97790, 7: 414805}),
+    # the king can jump round the four pawns, Board used to recurse forever on it
+    ('king jump cycle', 'w.....R..w......ww......ww......', RED,
+     {1: 7, 2: 66, 3: 200, 4: 1591, 5: 6628, 6: 52702, 7: 154219}),
+]
+
+def perft(position, depth, color):
+    """Leaf nodes of the move tree of `position` (Board or BitBoard) `depth` plies deep, `color` to move."""
+    if depth == 0:
+        return 1
+    moves = position.get_all_moves(color)
+    if depth == 1:
+        return len(moves)
+    opponent = WHITE if color == RED else RED
+    nodes = 0
+    for move in moves:
+        position.make_move(move)
+        nodes += perft(position, depth - 1, opponent)
+        position.unmake_move(move)
+    return nodes
+
+def divide(position, depth, color):
+    """{move text: leaf nodes under it} of every root move."""
+    opponent = WHITE if color == RED else RED
+    counts = {}
+    for move in position.get_all_moves(color):
+        position.make_move(move)
+        counts[move_to_text(move)] = perft(position, depth - 1, opponent)
+        position.unmake_move(move)
+    return counts
+
+def run(max_depth=5, board=True, bitboard=True):
+    """
+    Checks every reference position up to `max_depth` with the chosen backends, printing nodes per second.
+
+    Returns:
+    - list of (name, backend, depth, expected, got) that differ from REFERENCE, empty when all agree.
+    """
+    failures = []
+    for name, text, color, expected in REFERENCE:
+        backends = []
+        if board:
+            backends.append(('Board', position_from_text(text).to_board()))
+        if bitboard:
+            backends.append(('BitBoard', position_from_text(text)))
+        for backend, position in backends:
+            for depth in sorted(expected):
+                if depth > max_depth:
+                    break
+                start = time.perf_counter()
+                nodes = perft(position, depth, color)
+                elapsed = time.perf_counter() - start
+                status = 'ok' if nodes == expected[depth] else 'EXPECTED %d' % expected[depth]
+                print("%-18s %-8s depth %d: %9d nodes %8.0f nodes/s %s" % (
+                    name, backend, depth, nodes, nodes / elapsed if elapsed else 0, status))
+                if nodes != expected[depth]:
+                    failures.append((name, backend, depth, expected[depth], nodes))
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Counts move tree leaves of the reference positions.")
+    parser.add_argument('--depth', type=int, default=None, help="deepest depth (5 with Board, 7 BitBoard only)")
+    parser.add_argument('--bitboard', action='store_true', help="only the BitBoard generator")
+    args = parser.parse_args()
+    depth = args.depth if args.depth is not None else (7 if args.bitboard else 5)
+    failures = run(depth, board=not args.bitboard)
+    print('perft ok' if not failures else '%d counts differ' % len(failures))
+    raise SystemExit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
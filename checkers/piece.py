@@ -1,32 +1,42 @@
-import pygame
-from .constants import RED, WHITE, GREY, SQUARE_SIZE, CROWN
+from .constants import RED, WHITE, GREY, SQUARE_SIZE, CROWN_PATH, CROWN_SIZE
+
+_crown = None
+
+#pygame is only needed to draw, the engine never imports it
+def get_crown():
+    global _crown
+    if _crown is None:
+        import pygame
+        _crown = pygame.transform.scale(pygame.image.load(CROWN_PATH), CROWN_SIZE)
+    return _crown
 
 class Piece:
     PADDING = 15
     OUTLINE = 2
 
+    #no __dict__: the search keeps two dozen of these per board and copies boards around
+    __slots__ = ('row', 'col', 'color', 'king')
+
     def __init__(self, row, col, color):
         self.row = row
         self.col = col
         self.color = color
         self.king = False
-        self.x = 0
-        self.y = 0
-        self.calc_pos()
-
-    def calc_pos(self):
-        self.x = SQUARE_SIZE * self.col + SQUARE_SIZE // 2
-        self.y = SQUARE_SIZE * self.row + SQUARE_SIZE // 2
 
     def make_king(self):
         self.king = True
     
+    #pixel coordinates are the renderer's business, computed when the piece is drawn
     def draw(self, win):
+        import pygame
+        x = SQUARE_SIZE * self.col + SQUARE_SIZE // 2
+        y = SQUARE_SIZE * self.row + SQUARE_SIZE // 2
         radius = SQUARE_SIZE // 2 - self.PADDING
-        pygame.draw.circle(win, GREY, (self.x, self.y), radius + self.OUTLINE)
-        pygame.draw.circle(win, self.color, (self.x, self.y), radius)
+        pygame.draw.circle(win, GREY, (x, y), radius + self.OUTLINE)
+        pygame.draw.circle(win, self.color, (x, y), radius)
         if self.king:
-            win.blit(CROWN, (self.x - CROWN.get_width() // 2, self.y - CROWN.get_height() // 2))
+            crown = get_crown()
+            win.blit(crown, (x - crown.get_width() // 2, y - crown.get_height() // 2))
 
     def __repr__(self):
         return str(self.color)
@@ -34,4 +44,3 @@ class Piece:
     def move(self, row, col):
         self.row = row
         self.col = col
-        self.calc_pos()
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""Immutable 33 byte snapshot of a position and its side to move, for anything that keeps positions around."""
+
+from .constants import RED, WHITE
+from .squares import SQUARES, CELLS
+from .bitboard import BitBoard
+
+EMPTY, WHITE_PAWN, WHITE_KING, RED_PAWN, RED_KING = range(5)
+PIECES = {(WHITE, False): WHITE_PAWN, (WHITE, True): WHITE_KING, (RED, False): RED_PAWN, (RED, True): RED_KING}
+COLORS = {WHITE_PAWN: WHITE, WHITE_KING: WHITE, RED_PAWN: RED, RED_KING: RED}
+SIDES = {WHITE: 0, RED: 1}
+TURN = 32   # index of the side to move
+
+class Snapshot(bytes):
+    __slots__ = ()
+
+    @classmethod
+    def of(cls, position, color):
+        """Snapshot of `position` (Board or BitBoard) with `color` to move."""
+        if isinstance(position, BitBoard):
+            white, red, kings = position.white, position.red, position.kings
+            cells = bytearray(SQUARES + 1)
+            for square in range(SQUARES):
+                if white >> square & 1:
+                    cells[square] = WHITE_KING if kings >> square & 1 else WHITE_PAWN
+                elif red >> square & 1:
+                    cells[square] = RED_KING if kings >> square & 1 else RED_PAWN
+        else:
+            grid = position.board
+            cells = bytearray(EMPTY if grid[row][col] == 0 else PIECES[(grid[row][col].color, grid[row][col].king)]
+                              for row, col in CELLS)
+            cells.append(0)
+        cells[TURN] = SIDES[color]
+        return cls(cells)
+
+    @property
+    def turn(self):
+        return WHITE if self[TURN] == SIDES[WHITE] else RED
+
+    def piece(self, square):
+        """(color, king) of the piece on `square` (0-31), None when it is empty."""
+        code = self[square]
+        return (COLORS[code], code in (WHITE_KING, RED_KING)) if code != EMPTY else None
+
+    def to_bitboard(self):
+        white = red = kings = 0
+        for square in range(SQUARES):
+            code = self[square]
+            if code == EMPTY:
+                continue
+            bit = 1 << square
+            if COLORS[code] == WHITE:
+                white |= bit
+            else:
+                red |= bit
+            if code in (WHITE_KING, RED_KING):
+                kings |= bit
+        return BitBoard(white, red, kings)
+
+    def to_board(self):
+        return self.to_bitboard().to_board()
+
+    def to_position(self, kind):
+        """The position as a `kind` (Board or BitBoard)."""
+        return self.to_bitboard() if kind is BitBoard else self.to_board()
+
+    def __repr__(self):
+        chars = '.wWrR'
+        return 'Snapshot(%s %s)' % (''.join(chars[code] for code in self[:SQUARES]), 'w' if self.turn == WHITE else 'r')
@@ -0,0 +1,64 @@
+"""Geometry of the 32 dark squares, computed once at import. Square s is cell s+1 of the diagram in board.py."""
+
+from .constants import ROWS, COLS, RED, WHITE
+
+SQUARES = 32
+
+UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT = 0, 1, 2, 3
+DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+OPPOSITE = (DOWN_RIGHT, DOWN_LEFT, UP_RIGHT, UP_LEFT)
+
+def square_of(row, col):
+    return row * 4 + col // 2
+
+def row_col(square):
+    row = square // 4
+    return row, 2 * (square % 4) + (1 if row % 2 == 0 else 0)
+
+def _cell(row, col):
+    return (row, col) if 0 <= row < ROWS and 0 <= col < COLS else None
+
+# CELLS[square] -> (row, col)
+CELLS = tuple(row_col(square) for square in range(SQUARES))
+
+# NEIGHBOR_CELLS[square][direction] -> adjacent cell, None off the board
+NEIGHBOR_CELLS = tuple(tuple(_cell(row + dr, col + dc) for dr, dc in DIRECTIONS) for row, col in CELLS)
+
+# JUMP_CELLS[square][direction] -> landing cell of a jump over the adjacent cell, None off the board
+JUMP_CELLS = tuple(tuple(_cell(row + 2 * dr, col + 2 * dc) for dr, dc in DIRECTIONS) for row, col in CELLS)
+
+# NEIGHBORS[direction][square] -> adjacent square, -1 off the board
+NEIGHBORS = tuple(tuple(square_of(*cells[direction]) if cells[direction] is not None else -1 for cells in NEIGHBOR_CELLS)
+                  for direction in range(4))
+
+# ADJACENT_CELLS[square] -> the cells next to it (2 to 4)
+ADJACENT_CELLS = tuple(tuple(cell for cell in cells if cell is not None) for cells in NEIGHBOR_CELLS)
+
+# (jumped cell, landing cell) of every jump that stays on the board, towards row 0 and towards row 7
+JUMPS_UP = tuple(tuple((NEIGHBOR_CELLS[square][d], JUMP_CELLS[square][d]) for d in (UP_LEFT, UP_RIGHT)
+                       if JUMP_CELLS[square][d] is not None) for square in range(SQUARES))
+JUMPS_DOWN = tuple(tuple((NEIGHBOR_CELLS[square][d], JUMP_CELLS[square][d]) for d in (DOWN_LEFT, DOWN_RIGHT)
+                         if JUMP_CELLS[square][d] is not None) for square in range(SQUARES))
+
+# regions read by the evaluations, as sets of squares
+EDGE_SQUARES = frozenset(square for square, (row, col) in enumerate(CELLS) if row in (0, ROWS - 1) or col in (0, COLS - 1))
+CENTRAL_SQUARES = frozenset(square for square, (row, col) in enumerate(CELLS) if row in (2, 5) and col in (2, 5))
+MAIN_DIAGONAL_SQUARES = frozenset(square for square, (row, col) in enumerate(CELLS) if row == col)    # empty: row == col is light
+DOUBLE_DIAGONAL_SQUARES = frozenset(square for square, (row, col) in enumerate(CELLS) if abs(row + col - 7) == 2)
+DEFENDER_SQUARES = {
+    WHITE: frozenset(square for square, (row, _) in enumerate(CELLS) if row >= ROWS - 2),
+    RED: frozenset(square for square, (row, _) in enumerate(CELLS) if row < 2),
+}
+# the row each color promotes on
+PROMOTION_SQUARES = {
+    WHITE: frozenset(square for square, (row, _) in enumerate(CELLS) if row == ROWS - 1),
+    RED: frozenset(square for square, (row, _) in enumerate(CELLS) if row == 0),
+}
+
+# Board.is_protected of a square off the edge: (attacker cell, cell behind the piece, color of a pawn attacking from there)
+# for the four neighbors, None on the edge (always protected)
+PROTECTION = tuple(
+    None if square in EDGE_SQUARES else
+    tuple((NEIGHBOR_CELLS[square][d], NEIGHBOR_CELLS[square][OPPOSITE[d]], WHITE if d in (UP_LEFT, UP_RIGHT) else RED)
+          for d in range(4))
+    for square in range(SQUARES))
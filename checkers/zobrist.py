@@ -0,0 +1,32 @@
+import random
+from .constants import ROWS, COLS, RED, WHITE
+
+#Zobrist keys: one random 64 bit number per (color, king, row, col), xor-ed together for the pieces on the board.
+#Board.move/Board.remove keep board.zobrist up to date, so a position key costs nothing in the search.
+
+_rng = random.Random(20240613)
+
+def _random_key():
+    return _rng.getrandbits(64)
+
+PIECE_KEYS = {}
+for _color in (WHITE, RED):
+    for _king in (False, True):
+        PIECE_KEYS[(_color, _king)] = [[_random_key() for col in range(COLS)] for row in range(ROWS)]
+
+#xor-ed in when WHITE (the max player) is to move
+SIDE_KEY = _random_key()
+
+def piece_key(piece):
+    return PIECE_KEYS[(piece.color, piece.king)][piece.row][piece.col]
+
+def compute_hash(board):
+    key = 0
+    for row in board.board:
+        for piece in row:
+            if piece != 0:
+                key ^= piece_key(piece)
+    return key
+
+def position_key(position, max_player):
+    return position.zobrist ^ SIDE_KEY if max_player else position.zobrist
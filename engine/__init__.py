@@ -0,0 +1 @@
+from .engine import Engine, Limits, SearchResult, SearchHandle, PonderHandle
@@ -0,0 +1,123 @@
+"""
+Batch analysis of a file of PDN FEN positions on a process pool, one JSON line per position:
+
+    python -m engine.analyze positions.fen --depth 10 --workers 4 --output results.jsonl
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+from multiprocessing import Pool
+from checkers.notation import move_to_text, position_from_fen
+from .engine import Engine, Limits
+
+# positions waiting for a worker, per worker: the input is read as the workers need it
+PENDING_PER_WORKER = 2
+DEFAULT_DEPTH = 8
+
+_engine = None
+
+def _init_worker(options):
+    global _engine
+    _engine = Engine(stats=True, **options)
+
+def _analyze(task):
+    number, text, limits = task
+    try:
+        position, color = position_from_fen(text, board=False)
+    except ValueError as error:
+        return {'line': number, 'fen': text, 'error': str(error)}
+    #an empty table for every position, the result does not depend on the order of the file or on the worker
+    _engine.new_game()
+    result = _engine.best_move(position, limits, color)
+    return {
+        'line': number,
+        'fen': text,
+        'move': move_to_text(result.move) if result.move is not None else None,
+        'score': result.value if result.move is not None else None,
+        'depth': result.depth,
+        'pv': [move_to_text(move) for move in result.stats.pv],
+        'nodes': result.nodes,
+        'time': round(result.elapsed, 4),
+    }
+
+def read_positions(lines):
+    """(line number from 1, FEN text) of the lines holding a position."""
+    for number, line in enumerate(lines, 1):
+        text = line.strip()
+        if text and not text.startswith('#'):
+            yield number, text
+
+def analyze(lines, output, limits, workers=None, **options):
+    """
+    Analyzes the FEN `lines` (any iterable of str, read as the workers need them) and writes a JSON line per position to `output`.
+
+    Lines are written in the order the searches finish; "score" is evaluate_22F, positive good for WHITE,
+    "move" and "score" are null when the game is over.
+
+    Args:
+    - limits: Limits of every search.
+    - workers: processes, one per CPU by default.
+    - options: Engine arguments of the workers (table_bytes, quiescence, search, eval_config, tablebase).
+
+    Returns:
+    - number of lines written.
+    """
+    workers = workers or os.cpu_count() or 1
+    results = queue.Queue()
+    written = pending = 0
+
+    def write():
+        result = results.get()
+        if isinstance(result, BaseException):
+            raise result
+        output.write(json.dumps(result) + '\n')
+        output.flush()
+        return 1
+
+    with Pool(workers, _init_worker, (options,)) as pool:
+        for number, text in read_positions(lines):
+            if pending >= workers * PENDING_PER_WORKER:
+                written += write()
+                pending -= 1
+            pool.apply_async(_analyze, ((number, text, limits),), callback=results.put, error_callback=results.put)
+            pending += 1
+        while pending:
+            written += write()
+            pending -= 1
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyzes a file of PDN FEN positions, one JSON line per position.")
+    parser.add_argument('input', help="file with one FEN per line, - for stdin")
+    parser.add_argument('--output', default=None, help="JSON lines file, stdout by default")
+    parser.add_argument('--depth', type=int, default=None, help="plies per position (%d without any limit)" % DEFAULT_DEPTH)
+    parser.add_argument('--time', type=float, default=None, help="seconds per position")
+    parser.add_argument('--nodes', type=int, default=None, help="nodes per position")
+    parser.add_argument('--workers', type=int, default=None, help="processes, one per CPU by default")
+    parser.add_argument('--table-mb', type=int, default=16, help="transposition table of every worker")
+    parser.add_argument('--quiescence', type=int, default=None, help="capture search nodes at the horizon")
+    parser.add_argument('--search', choices=('pvs',), default=None, help="pvs for the principal variation search")
+    parser.add_argument('--eval-config', default=None, help="EvalConfig JSON file (checkers/features.py)")
+    parser.add_argument('--tablebase', default=None, help="tablebase directory (python -m tablebase.generator)")
+    args = parser.parse_args()
+    limits = Limits(args.depth, args.time, args.nodes)
+    if limits.depth is None and limits.time is None and limits.nodes is None:
+        limits.depth = DEFAULT_DEPTH
+    options = {'table_bytes': args.table_mb * 1024 * 1024, 'quiescence': args.quiescence, 'search': args.search,
+               'eval_config': args.eval_config, 'tablebase': args.tablebase}
+    source = sys.stdin if args.input == '-' else open(args.input)
+    output = sys.stdout if args.output is None else open(args.output, 'w')
+    try:
+        count = analyze(source, output, limits, args.workers, **options)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    print("%d positions analyzed" % count, file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
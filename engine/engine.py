@@ -0,0 +1,332 @@
+import time
+import threading
+from copy import deepcopy
+from checkers.constants import RED, WHITE
+from checkers.board import Board
+from checkers.bitboard import BitBoard, to_board_move
+from checkers.features import EvalConfig
+from checkers.snapshot import Snapshot
+from minimax.algorithm import _play, SearchBudget
+from minimax.iterative import iterative_search
+from minimax.ordering import MoveOrdering
+from minimax.quiescence import Quiescence
+from minimax.stats import SearchStats
+from minimax.transposition import TranspositionTable
+from tablebase import Tablebase
+from book import OpeningBook
+
+class Limits:
+    """
+    How long a search may run. Every limit that is set applies, the first one reached stops the search.
+
+    Args:
+    - depth: deepest iteration (plies).
+    - time: seconds of wall clock.
+    - nodes: searched nodes.
+    """
+
+    MAX_DEPTH = 64
+
+    def __init__(self, depth=None, time=None, nodes=None):
+        self.depth = depth
+        self.time = time
+        self.nodes = nodes
+
+    def __repr__(self):
+        return 'Limits(depth=%s, time=%s, nodes=%s)' % (self.depth, self.time, self.nodes)
+
+class SearchResult:
+    def __init__(self, move, value, depth, position, nodes, elapsed, stats=None):
+        self.move = move            # Move (Board) or move tuple (BitBoard), None if the game is over
+        self.value = value          # evaluate_22F score, positive is good for WHITE
+        self.depth = depth          # deepest completed iteration
+        self.position = position    # copy of the position after the move
+        self.nodes = nodes
+        self.elapsed = elapsed      # seconds
+        self.stats = stats          # SearchStats when the Engine collects them
+
+    def __repr__(self):
+        return 'SearchResult(move=%s, value=%s, depth=%s, nodes=%s, elapsed=%.3f)' % (
+            self.move, self.value, self.depth, self.nodes, self.elapsed)
+
+class SearchHandle:
+    """
+    A best_move running on a background thread, returned by Engine.start.
+
+    Args:
+    - on_done: called with the SearchResult from the search thread when it ends (not when cancelled).
+    """
+
+    def __init__(self, engine, position, limits, color, on_done=None):
+        self.budget = SearchBudget(limits.time, limits.nodes)
+        self.cancelled = False
+        self.on_done = on_done
+        self._result = None
+        self._thread = threading.Thread(target=self._run, args=(engine, position, limits, color), daemon=True)
+        self._thread.start()
+
+    def _run(self, engine, position, limits, color):
+        self._result = engine.best_move(position, limits, color, self.budget)
+        if self.on_done is not None and not self.cancelled:
+            self.on_done(self._result)
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def result(self, timeout=None):
+        """Waits for the search (at most `timeout` seconds), its SearchResult or None if cancelled or still running."""
+        self._thread.join(timeout)
+        if self.cancelled or self._thread.is_alive():
+            return None
+        return self._result
+
+    def stop(self):
+        """Asks for a move now: the search ends soon with the deepest iteration completed so far."""
+        self.budget.stop()
+
+    def move_now(self):
+        self.stop()
+        return self.result()
+
+    def cancel(self):
+        """Stops the search and drops its result."""
+        self.cancelled = True
+        self.budget.stop()
+        self._thread.join()
+
+class PonderHandle:
+    """
+    Searches on the opponent's time, returned by Engine.ponder.
+
+    The opponent's likely reply (a short search from their side) is searched first, then the
+    other replies, each with the depth of `limits` and no clock. hit() turns the ponder into the
+    engine's real search once the opponent has moved.
+    """
+
+    PREDICT_TIME = 0.1  # seconds spent guessing the reply
+
+    def __init__(self, engine, position, limits, color):
+        self.engine = engine
+        self.limits = limits
+        self.color = WHITE if color == RED else RED     # the engine's side, to move after the reply
+        self.lock = threading.Lock()
+        self.results = {}           # zobrist key after a reply -> its finished SearchResult, position kept as a Snapshot
+        self.current = None         # zobrist key of the reply being searched
+        self.budget = None          # budget of that search
+        self.hit_key = None
+        self.hit_time = None
+        self.stopped = False
+        self._result = None
+        self._thread = threading.Thread(target=self._run, args=(position, color), daemon=True)
+        self._thread.start()
+
+    def _replies(self, position, color):
+        moves = position.analysis().moves(color)
+        predicted = self.engine.best_move(position, Limits(depth=self.limits.depth, time=self.PREDICT_TIME), color,
+                                          report=False).move
+        if predicted in moves:
+            moves.remove(predicted)
+            moves.insert(0, predicted)
+        return moves
+
+    def _run(self, position, color):
+        if position.analysis().winner() != None:
+            return
+        for reply in self._replies(position, color):
+            child = _play(position, reply)
+            with self.lock:
+                if self.stopped:
+                    return
+                self.current, self.budget = child.zobrist, SearchBudget()
+                budget = self.budget
+            result = self.engine.best_move(child, Limits(depth=self.limits.depth), self.color, budget, report=False)
+            with self.lock:
+                self.current = None
+                if self.hit_key == child.zobrist:
+                    #the opponent played it while it was searched, only the time after their move counts
+                    result.elapsed = time.perf_counter() - self.hit_time
+                    self._result = result
+                    self.engine._report(result.stats)
+                    return
+                if budget.stopped:
+                    return
+                if result.position is not None:
+                    result.position = Snapshot.of(result.position, WHITE if self.color == RED else RED)
+                self.results[child.zobrist] = result
+
+    def hit(self, position):
+        """
+        The opponent moved to `position` (Board or BitBoard of the type pondered): returns the handle of the engine's search.
+
+        A finished reply is returned at once, the reply being searched keeps its search and gets the
+        time and node limits from now on, any other position starts a new search (with the table still warm).
+        """
+        key = position.zobrist
+        with self.lock:
+            if key in self.results:
+                self._result = self.results[key]
+                if self._result.position is not None:
+                    self._result.position = self._result.position.to_position(type(position))
+                self._result.elapsed = 0.0
+                self.engine._report(self._result.stats)
+                self.stopped = True
+                if self.budget is not None:
+                    self.budget.stop()
+                self.hit_key = key
+                return self
+            if key == self.current:
+                self.hit_key, self.hit_time = key, time.perf_counter()
+                if self.limits.time is not None:
+                    self.budget.deadline = self.hit_time + self.limits.time
+                if self.limits.nodes is not None:
+                    self.budget.node_limit = self.budget.nodes + self.limits.nodes
+                return self
+        self.cancel()
+        return self.engine.start(position, self.limits, self.color)
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def result(self, timeout=None):
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            return None
+        return self._result
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+            if self.budget is not None:
+                self.budget.stop()
+
+    def move_now(self):
+        self.stop()
+        return self.result()
+
+    def cancel(self):
+        self.stop()
+        self._thread.join()
+        self._result = None
+
+class Engine:
+    """
+    Headless checkers engine: rules, board and search without pygame.
+
+    The transposition table and the move ordering history stay warm between calls,
+    use one Engine per game (or new_game() between games).
+
+    Args:
+    - table_bytes: transposition table memory cap.
+    - bitboard: search Board positions on a BitBoard copy (same moves, much faster).
+    - tablebase: directory of tablebase files (python -m tablebase.generator), None to search endgames too.
+    - book: opening book file (python -m book.builder), its positions are answered without searching.
+    - stats: collect SearchStats (nodes, cutoffs, evaluation time, principal variation...) of every search.
+    - on_stats: called with the SearchStats of every search, implies stats.
+    - stats_log: file the SearchStats of every search are appended to as JSON lines, implies stats.
+    - eval_config: EvalConfig (checkers/features.py) or the path of its JSON file, features and weights of the evaluation.
+    - quiescence: node limit of the capture search at the horizon of every iteration, None to score the horizon as it is.
+    - search: None for alpha beta, 'pvs' for the principal variation search with aspiration windows.
+    """
+
+    def __init__(self, table_bytes=64 * 1024 * 1024, bitboard=True, tablebase=None, book=None, stats=False, on_stats=None,
+                 stats_log=None, eval_config=None, quiescence=None, search=None):
+        self.table = TranspositionTable(table_bytes)
+        self.ordering = MoveOrdering()
+        self.bitboard = bitboard
+        self.tablebase = Tablebase(tablebase) if tablebase is not None else None
+        self.book = OpeningBook(book) if book is not None else None
+        self.budget = None
+        self.stats = stats or on_stats is not None or stats_log is not None
+        self.on_stats = on_stats
+        self.stats_log = stats_log
+        if isinstance(eval_config, str):
+            eval_config = EvalConfig.load(eval_config)
+        self.evaluator = eval_config.evaluator() if eval_config is not None and not eval_config.is_default() else None
+        self.quiescence = Quiescence(quiescence) if quiescence is not None else None
+        if search not in (None, 'pvs'):
+            raise ValueError("unknown search %r" % search)
+        self.search = search
+
+    def new_game(self):
+        self.table.clear()
+        self.ordering = MoveOrdering()
+
+    def stop(self):
+        """Ends the running best_move (from another thread) with the deepest search completed so far."""
+        budget = self.budget
+        if budget is not None:
+            budget.stop()
+
+    def start(self, position, limits=None, color=WHITE, on_done=None):
+        """
+        best_move on a background thread, returns its SearchHandle at once.
+
+        The search works on a copy, `position` can be drawn (or replaced) while it runs.
+        Only one search per Engine should run at a time, they share the transposition table.
+        """
+        if limits is None:
+            limits = Limits(depth=5)
+        position = deepcopy(position) if isinstance(position, Board) else position.copy()
+        return SearchHandle(self, position, limits, color, on_done)
+
+    def ponder(self, position, limits=None, color=RED):
+        """
+        Starts searching on the opponent's time, `color` is the opponent to move in `position`.
+
+        Call hit() on the returned PonderHandle with the position after their move to get the
+        engine's search, or cancel() it. The transposition table stays warm either way.
+        """
+        if limits is None:
+            limits = Limits(depth=5)
+        position = deepcopy(position) if isinstance(position, Board) else position.copy()
+        return PonderHandle(self, position, limits, color)
+
+    def legal_moves(self, position, color):
+        return position.analysis().moves(color)
+
+    def best_move(self, position, limits=None, color=WHITE, budget=None, report=True):
+        """
+        Searches `position` (Board or BitBoard, left unchanged) for `color` within `limits` (default: depth 5).
+
+        A caller that may stop the search from another thread before it starts can pass its own
+        SearchBudget (its time and node limits replace the ones of `limits`). With report False the
+        stats are not passed to on_stats/stats_log (searches whose move may never be played).
+        """
+        if limits is None:
+            limits = Limits(depth=5)
+        start = time.perf_counter()
+        searched = position
+        if self.bitboard and isinstance(position, Board):
+            searched = BitBoard.from_board(position)
+        stats = SearchStats() if self.stats else None
+        found = self.book.choose(searched, color) if self.book is not None else None
+        if found is not None:
+            #book move, depth 0: nothing was searched
+            move, value = found
+            depth, nodes = 0, 0
+            if stats is not None:
+                stats.move, stats.value, stats.pv = move, value, [move]
+        else:
+            self.budget = budget if budget is not None else SearchBudget(limits.time, limits.nodes)
+            value, move, depth, nodes = iterative_search(searched, color == WHITE, max_depth=limits.depth or Limits.MAX_DEPTH,
+                                                         table=self.table, ordering=self.ordering, budget=self.budget,
+                                                         tablebase=self.tablebase, evaluator=self.evaluator, stats=stats,
+                                                         quiescence=self.quiescence, search=self.search)
+        if move is not None and searched is not position:
+            move = to_board_move(position, move, color)
+        new_position = _play(position, move) if move is not None else position
+        elapsed = time.perf_counter() - start
+        if stats is not None:
+            stats.elapsed = elapsed
+            if report:
+                self._report(stats)
+        return SearchResult(move, value, depth, new_position, nodes, elapsed, stats)
+
+    def _report(self, stats):
+        if stats is None:
+            return
+        if self.on_stats is not None:
+            self.on_stats(stats)
+        if self.stats_log is not None:
+            with open(self.stats_log, 'a') as file:
+                stats.write(file)
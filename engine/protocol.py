@@ -0,0 +1,134 @@
+"""
+Line based text protocol over stdin/stdout to drive the Engine from another program:
+
+    python -m engine.protocol
+"""
+
+import sys
+import threading
+from checkers.constants import RED, WHITE
+from checkers.bitboard import BitBoard
+from checkers.notation import move_to_text, parse_move, position_to_text, position_from_text, position_from_fen
+from .engine import Engine, Limits
+
+SIDE_CHARS = {WHITE: 'w', RED: 'r'}
+
+# commands, one per line: isready, newgame, position startpos|board <32 chars> <w|r>|fen <PDN FEN> [moves 22-18 ...],
+# show, legal, go [depth N] [movetime MS] [nodes N] (answered bestmove <move|none> value V depth D nodes N time MS),
+# stop, quit; errors are answered "error <message>"
+
+class ProtocolServer:
+    """
+    Reads commands from `input` and writes answers to `output` until quit or end of input.
+
+    Args:
+    - engine: Engine to search with, a new one if None.
+    """
+
+    def __init__(self, engine=None, input=sys.stdin, output=sys.stdout):
+        self.engine = engine if engine is not None else Engine()
+        self.input = input
+        self.output = output
+        self.position = BitBoard.initial()
+        self.turn = RED
+        self.search = None
+        self.lock = threading.Lock()
+
+    def send(self, line):
+        #the search thread answers too
+        with self.lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    def run(self):
+        for line in self.input:
+            words = line.split()
+            if not words:
+                continue
+            if words[0] == 'quit':
+                break
+            try:
+                self.handle(words)
+            except (ValueError, IndexError) as error:
+                self.send('error %s' % error)
+        self.stop()
+
+    def handle(self, words):
+        command, args = words[0], words[1:]
+        if command == 'isready':
+            self.send('readyok')
+        elif command == 'stop':
+            self.stop()
+        elif self.searching():
+            raise ValueError("searching, send stop first")
+        elif command == 'newgame':
+            self.engine.new_game()
+        elif command == 'position':
+            self.set_position(args)
+        elif command == 'show':
+            self.send('board %s %s' % (position_to_text(self.position), SIDE_CHARS[self.turn]))
+        elif command == 'legal':
+            analysis = self.position.analysis()
+            moves = analysis.moves(self.turn) if analysis.winner() is None else []
+            self.send(' '.join(['legal'] + [move_to_text(move) for move in moves]))
+        elif command == 'go':
+            self.go(args)
+        else:
+            raise ValueError("unknown command %r" % command)
+
+    def set_position(self, args):
+        if args[0] == 'startpos':
+            position, turn, rest = BitBoard.initial(), RED, args[1:]
+        elif args[0] == 'board':
+            if args[2] not in ('w', 'r'):
+                raise ValueError("side to move must be w or r")
+            position, turn, rest = position_from_text(args[1]), WHITE if args[2] == 'w' else RED, args[3:]
+        elif args[0] == 'fen' and len(args) > 1:
+            #the FEN runs up to the moves, a [FEN "..."] tag has spaces in it
+            end = args.index('moves') if 'moves' in args else len(args)
+            (position, turn), rest = position_from_fen(' '.join(args[1:end]), board=False), args[end:]
+        else:
+            raise ValueError("position startpos|board|fen ...")
+        if rest:
+            if rest[0] != 'moves':
+                raise ValueError("expected moves, got %r" % rest[0])
+            for text in rest[1:]:
+                position.make_move(parse_move(position, text, turn))
+                turn = RED if turn == WHITE else WHITE
+        self.position, self.turn = position, turn
+
+    def go(self, args):
+        if len(args) % 2:
+            raise ValueError("go [depth N] [movetime MS] [nodes N]")
+        limits = Limits()
+        for name, value in zip(args[::2], args[1::2]):
+            if name == 'depth':
+                limits.depth = int(value)
+            elif name == 'movetime':
+                limits.time = int(value) / 1000.0
+            elif name == 'nodes':
+                limits.nodes = int(value)
+            else:
+                raise ValueError("unknown limit %r" % name)
+        if limits.depth is None and limits.time is None and limits.nodes is None:
+            limits.depth = 5
+        self.search = self.engine.start(self.position, limits, self.turn, on_done=self.report)
+
+    def report(self, result):
+        self.send('bestmove %s value %s depth %d nodes %d time %d' % (
+            move_to_text(result.move) if result.move is not None else 'none',
+            round(result.value, 3), result.depth, result.nodes, round(result.elapsed * 1000)))
+
+    def searching(self):
+        return self.search is not None and not self.search.done()
+
+    def stop(self):
+        if self.search is not None:
+            self.search.move_now()
+            self.search = None
+
+def main():
+    ProtocolServer().run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""
+Self-play between two engine configurations on a process pool:
+
+    python -m engine.tournament --a evaluate_22F,minimax_alpha_beta,depth=4 --b advanced_evaluate,minimax_alpha_beta,depth=4 --games 200
+"""
+
+import argparse
+import math
+import random
+import time
+from multiprocessing import Pool
+from checkers.constants import RED, WHITE
+from checkers.bitboard import BitBoard
+from checkers.snapshot import Snapshot
+from checkers.pdn import new_game, write_game
+from checkers.features import EvalConfig
+from minimax.algorithm import _alpha_beta, _simple_minimax, SearchBudget
+from minimax.iterative import iterative_search
+from minimax.ordering import MoveOrdering
+from minimax.quiescence import Quiescence
+from minimax.transposition import TranspositionTable
+
+EVALUATORS = {
+    'evaluate': BitBoard.evaluate,
+    'advanced_evaluate': BitBoard.advanced_evaluate,
+    'evaluate_22F': BitBoard.evaluate_22F,
+}
+SEARCHES = ('simple_minimax', 'minimax_alpha_beta', 'minimax_pvs')
+ITERATIVE_SEARCHES = {'simple_minimax': 'simple_minimax', 'minimax_alpha_beta': None, 'minimax_pvs': 'pvs'}
+# every random opening is played twice with the colors swapped, a game is drawn after a threefold
+# repetition or MAX_PLIES plies
+MAX_PLIES = 200
+OPENING_PLIES = 4
+
+class PlayerConfig:
+    """
+    How one side of the tournament plays.
+
+    Args:
+    - evaluator: name in EVALUATORS or path of an EvalConfig JSON file.
+    - search: name in SEARCHES.
+    - depth: fixed depth per move, or
+    - time: seconds per move, searched with iterative deepening.
+    - quiescence: node limit of the capture search at the horizon, None without one.
+    """
+
+    def __init__(self, evaluator='evaluate_22F', search='minimax_alpha_beta', depth=None, time=None, quiescence=None):
+        if evaluator not in EVALUATORS and not evaluator.endswith('.json'):
+            raise ValueError("unknown evaluator %r" % evaluator)
+        if search not in SEARCHES:
+            raise ValueError("unknown search %r" % search)
+        if (depth is None) == (time is None):
+            raise ValueError("give a depth or a time")
+        self.evaluator = evaluator
+        self.search = search
+        self.depth = depth
+        self.time = time
+        self.quiescence = quiescence
+
+    @classmethod
+    def parse(cls, text):
+        """PlayerConfig of "evaluator,search,depth=N" or "evaluator,search,time=SECONDS", then ",quiescence=N"."""
+        evaluator, search, *limits = text.split(',')
+        options = {}
+        for limit in limits:
+            name, value = limit.split('=')
+            if name == 'depth' or name == 'quiescence':
+                options[name] = int(value)
+            elif name == 'time':
+                options[name] = float(value)
+            else:
+                raise ValueError("unknown limit %r" % name)
+        return cls(evaluator, search, **options)
+
+    def __str__(self):
+        limit = 'depth=%d' % self.depth if self.depth is not None else 'time=%g' % self.time
+        if self.quiescence is not None:
+            limit += ',quiescence=%d' % self.quiescence
+        return '%s,%s,%s' % (self.evaluator, self.search, limit)
+
+class Player:
+    """A PlayerConfig with its search state (transposition table, move ordering) for one game."""
+
+    def __init__(self, config):
+        self.config = config
+        if config.evaluator in EVALUATORS:
+            self.evaluator = EVALUATORS[config.evaluator]
+        else:
+            self.evaluator = EvalConfig.load(config.evaluator).evaluator()
+        self.table = TranspositionTable(8 * 1024 * 1024)
+        self.ordering = MoveOrdering()
+        self.quiescence = Quiescence(config.quiescence) if config.quiescence is not None else None
+
+    def choose(self, position, color):
+        """(move, nodes, score) for `color` in `position`."""
+        config, max_player = self.config, color == WHITE
+        captures = self.quiescence.nodes if self.quiescence is not None else 0
+        if config.time is not None:
+            search = ITERATIVE_SEARCHES[config.search]
+            value, move, _, nodes = iterative_search(position, max_player, time_limit=config.time, table=self.table,
+                                                     ordering=self.ordering, evaluator=self.evaluator, search=search,
+                                                     quiescence=self.quiescence)
+            return move, nodes + self._quiescence_nodes(captures), value
+        budget = SearchBudget()
+        if config.search == 'simple_minimax':
+            value, move = _simple_minimax(position, config.depth, max_player, None, 0, budget, self.evaluator)
+        else:
+            self.ordering.new_search()
+            value, move = _alpha_beta(position, config.depth, float('-inf'), float('inf'), max_player, self.table, 0, budget,
+                                      self.ordering, evaluator=self.evaluator, quiescence=self.quiescence,
+                                      pvs=config.search == 'minimax_pvs')
+        return move, budget.nodes + self._quiescence_nodes(captures), value
+
+    def _quiescence_nodes(self, before):
+        return self.quiescence.nodes - before if self.quiescence is not None else 0
+
+def game_over(position, color):
+    """Winner of `position` with `color` to move, None while the game goes on."""
+    return position.analysis().game_over(color)
+
+def random_opening(seed, plies=OPENING_PLIES):
+    """Position and side to move after `plies` random moves from the standard setup."""
+    rng = random.Random(seed)
+    position, color = BitBoard.initial(), RED
+    for _ in range(plies):
+        moves = position.get_all_moves(color)
+        if not moves:
+            break
+        position.move(*rng.choice(moves))
+        color = WHITE if color == RED else RED
+    return position, color
+
+def play_game(task):
+    """
+    Plays one game, `task` is (config_a, config_b, opening seed, True if A plays WHITE).
+
+    Returns:
+    - (score of A: 1, 0.5 or 0, stats of A, stats of B, PdnGame), stats being (move latencies, nodes)
+    """
+    config_a, config_b, seed, a_white = task
+    position, color = random_opening(seed)
+    players = {WHITE: Player(config_a if a_white else config_b), RED: Player(config_b if a_white else config_a)}
+    #PDN White is RED
+    record = new_game(position, color, Event='tournament', Round=seed, White=str(players[RED].config),
+                      Black=str(players[WHITE].config))
+    stats = {WHITE: ([], 0), RED: ([], 0)}
+    seen = {}
+    winner = None
+    for ply in range(MAX_PLIES):
+        winner = game_over(position, color)
+        if winner is not None:
+            break
+        key = Snapshot.of(position, color)
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] >= 3:
+            break
+        start = time.perf_counter()
+        move, nodes, value = players[color].choose(position, color)
+        latencies, total = stats[color]
+        latencies.append(time.perf_counter() - start)
+        stats[color] = (latencies, total + nodes)
+        record.add(move, value, latencies[-1])
+        position.move(*move)
+        color = WHITE if color == RED else RED
+    a_color = WHITE if a_white else RED
+    score = 0.5 if winner is None else (1.0 if winner == a_color else 0.0)
+    record.finish(winner)
+    return score, stats[a_color], stats[WHITE if a_color == RED else RED], record
+
+def elo(score):
+    """Elo difference of an expected score, clamped away from 0 and 1."""
+    score = min(max(score, 1e-3), 1 - 1e-3)
+    return -400 * math.log10(1 / score - 1) + 0.0    # no "-0"
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def run(config_a, config_b, games=100, workers=None, seed=0, pdn=None):
+    """
+    Plays `games` games (rounded up to pairs) and returns the report as a dict.
+
+    With `pdn` (a path) every game is appended to that PDN file as soon as it ends.
+
+    Report:
+    - wins, draws, losses: from A
+    - elo, elo_low, elo_high: Elo of A over B with its 95% interval
+    - nodes_per_second, latency: per configuration, latency being the 50th, 90th and 99th percentile (seconds)
+    - games_per_hour
+    """
+    pairs = (games + 1) // 2
+    tasks = [(config_a, config_b, seed + pair, a_white) for pair in range(pairs) for a_white in (True, False)]
+    scores, latencies, nodes = [], ([], []), [0, 0]
+    start = time.perf_counter()
+    records = open(pdn, 'a') if pdn is not None else None
+    try:
+        with Pool(workers) as pool:
+            for score, stats_a, stats_b, record in pool.imap_unordered(play_game, tasks):
+                if records is not None:
+                    write_game(records, record)
+                scores.append(score)
+                for side, (game_latencies, game_nodes) in enumerate((stats_a, stats_b)):
+                    latencies[side].extend(game_latencies)
+                    nodes[side] += game_nodes
+    finally:
+        if records is not None:
+            records.close()
+    elapsed = time.perf_counter() - start
+
+    mean = sum(scores) / len(scores)
+    deviation = math.sqrt(sum((score - mean) ** 2 for score in scores) / len(scores))
+    margin = 1.96 * deviation / math.sqrt(len(scores))
+    report = {
+        'games': len(scores),
+        'wins': scores.count(1.0), 'draws': scores.count(0.5), 'losses': scores.count(0.0),
+        'elo': elo(mean), 'elo_low': elo(mean - margin), 'elo_high': elo(mean + margin),
+        'games_per_hour': len(scores) / elapsed * 3600,
+    }
+    for side, name in enumerate(('a', 'b')):
+        thinking = sum(latencies[side])
+        report['nodes_per_second_' + name] = nodes[side] / thinking if thinking else 0.0
+        report['latency_' + name] = tuple(percentile(latencies[side], fraction) for fraction in (0.5, 0.9, 0.99))
+    return report
+
+def print_report(config_a, config_b, report):
+    print("A: %s\nB: %s" % (config_a, config_b))
+    print("%d games: +%d =%d -%d" % (report['games'], report['wins'], report['draws'], report['losses']))
+    print("Elo A - B: %+.0f (95%%: %+.0f .. %+.0f)" % (report['elo'], report['elo_low'], report['elo_high']))
+    for name in ('a', 'b'):
+        p50, p90, p99 = report['latency_' + name]
+        print("%s: %.0f nodes/s, move latency p50 %.3f s p90 %.3f s p99 %.3f s" % (
+            name.upper(), report['nodes_per_second_' + name], p50, p90, p99))
+    print("%.0f games per hour" % report['games_per_hour'])
+
+def main():
+    parser = argparse.ArgumentParser(description="Plays two engine configurations against each other.")
+    parser.add_argument('--a', default='evaluate_22F,minimax_alpha_beta,depth=4', help="evaluator,search,depth=N|time=S")
+    parser.add_argument('--b', default='evaluate,minimax_alpha_beta,depth=4')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None, help="processes, one per CPU by default")
+    parser.add_argument('--seed', type=int, default=0, help="first opening seed")
+    parser.add_argument('--pdn', default=None, help="PDN file the games are appended to")
+    args = parser.parse_args()
+    config_a, config_b = PlayerConfig.parse(args.a), PlayerConfig.parse(args.b)
+    print_report(config_a, config_b, run(config_a, config_b, args.games, args.workers, args.seed, args.pdn))
+
+if __name__ == '__main__':
+    main()
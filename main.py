@@ -1,17 +1,28 @@
+import time
 import pygame
-import datetime
 from checkers.constants import WIDTH, HEIGHT, SQUARE_SIZE, RED, WHITE
 from checkers.game import Game
-from minimax.algorithm import minimax_alpha_beta
+from checkers.pdn import write_game
+from engine import Engine, Limits
 
 #Inspired by Paulo Padrao and TechWithTim
 
-WIN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption('Checkers')
-
 FPS = 45
-AI_DEPTH = 5    # how many moves ahead the AI looks at (careful! I reccomend 5)
+AI_TIME_LIMIT = 1.0    # seconds the AI may think per move, it searches as deep as it can in that time
+AI_MAX_DEPTH = 30
 AI_ENABLED = True  #play with/without AI
+AI_BITBOARD = True  #search on BitBoard instead of Board (same moves, much faster)
+AI_TABLE_MB = 64    #memory for the transposition table, kept between moves
+AI_TABLEBASE = None  #directory made by python -m tablebase.generator, endgames in it are played perfectly
+AI_BOOK = None      #file made by python -m book.builder, the first moves are played from it at once
+AI_PONDER = True    #search the likely replies while RED thinks, the AI answers faster when it guessed right
+AI_SEARCH = 'pvs'   #'pvs' principal variation search with aspiration windows, None plain alpha beta
+AI_QUIESCENCE = 64  #nodes to play out the captures left at the horizon before scoring it, None to score it as it is
+AI_EVAL_CONFIG = None  #JSON file switching evaluation features off or reweighting them (see checkers/features.py)
+AI_STATS_LOG = None  #file the search statistics of every AI move are appended to (JSON lines)
+AI_PRINT_STATS = False  #also print the search statistics (nodes, branching factor, principal variation) after every AI move
+GAME_LOG = None     #PDN file every game is appended to when the window closes, with the AI's scores and times
+#while the AI thinks: SPACE plays the best move found so far, ESC cancels the search and lets you move WHITE
 
 def get_row_col_from_mouse(pos):
     x, y = pos
@@ -20,35 +31,66 @@ def get_row_col_from_mouse(pos):
     return row, col
 
 def main():
+    win = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption('Checkers')
+
     run = True
     clock = pygame.time.Clock()
-    game = Game(WIN)
+    game = Game(win)
+    engine = Engine(AI_TABLE_MB * 1024 * 1024, bitboard=AI_BITBOARD, tablebase=AI_TABLEBASE, book=AI_BOOK, stats=True,
+                    stats_log=AI_STATS_LOG, eval_config=AI_EVAL_CONFIG,
+                    quiescence=AI_QUIESCENCE, search=AI_SEARCH)
+    search = None       #SearchHandle of the running AI search
+    ponder = None       #PonderHandle running during RED's turn
+    ai_paused = False   #search cancelled, WHITE is moved by hand this turn
 
     while run:
         clock.tick(FPS)
 
-        if game.board.is_winner(RED):
+        #the analysis is computed once per position, not once per frame
+        if game.board.analysis().is_winner(RED):
             print("game over, RED won!")
             run = False
             break
 
-        if game.turn == WHITE and AI_ENABLED:
-            start = datetime.datetime.now()
-            value, new_board = minimax_alpha_beta(game.get_board(), AI_DEPTH, float('-inf'), float('inf'), WHITE, game)
-            end = datetime.datetime.now()
-            print("[",(end - start).total_seconds()," s] value: ", value)
-            game.ai_move(new_board)
+        limits = Limits(depth=AI_MAX_DEPTH, time=AI_TIME_LIMIT)
+        if game.turn == RED:
+            ai_paused = False
+            if AI_ENABLED and AI_PONDER and ponder is None:
+                ponder = engine.ponder(game.get_board(), limits, RED)
+        elif AI_ENABLED and not ai_paused:
+            #the search runs on its own thread, the loop keeps drawing and handling events
+            if search is None and ponder is not None:
+                search = ponder.hit(game.get_board())
+                ponder = None
+            elif search is None:
+                search = engine.start(game.get_board(), limits, WHITE)
+            elif search.done():
+                result = search.result()
+                search = None
+                print("[", round(result.elapsed, 3), " s] depth: ", result.depth, " value: ", result.value, " first move cutoffs: ", round(engine.ordering.first_move_cutoff_rate(), 3))
+                if AI_PRINT_STATS:
+                    print("   ", result.stats)
+                game.ai_move(result.position, result.move, result.value, result.elapsed)
 
-        if game.board.is_winner(WHITE):
+        if game.board.analysis().is_winner(WHITE):
             print("game over, WHITE won!")
             run = False
             break
-        
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 run = False
 
-            if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.type == pygame.KEYDOWN and search is not None:
+                if event.key == pygame.K_SPACE:
+                    search.stop()
+                elif event.key == pygame.K_ESCAPE:
+                    search.cancel()
+                    search = None
+                    ai_paused = True
+
+            if event.type == pygame.MOUSEBUTTONDOWN and search is None:
                 pos = pygame.mouse.get_pos()
                 row, col = get_row_col_from_mouse(pos)
                 #if game.turn == RED:
@@ -56,7 +98,17 @@ def main():
         
         game.update()
 
+    if search is not None:
+        search.cancel()
+    if ponder is not None:
+        ponder.cancel()
+    if GAME_LOG is not None and game.record.moves:
+        #PDN White is RED (the human), Black is WHITE
+        game.record.tags.update({'Event': 'Checkers', 'Date': time.strftime('%Y.%m.%d'), 'White': 'human',
+                                 'Black': 'AI' if AI_ENABLED else 'human'})
+        with open(GAME_LOG, 'a') as file:
+            write_game(file, game.finish_record())
     pygame.quit()
-         
 
-main()
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -1,32 +1,81 @@
 from copy import deepcopy
-import pygame
+import time
+from checkers.bitboard import BitBoard
+from checkers.zobrist import position_key
+from .transposition import EXACT, LOWER, UPPER
 
 RED = (255, 0, 0)
 WHITE = (255, 255, 255)
 
 # basic min max (not optimized)
-def simple_minimax(position, depth, max_player, game):
+# table: optional TranspositionTable, only exact values are reused since there is no window
+# evaluator: optional function(position) -> score replacing position.evaluate at the leaves
+def simple_minimax(position, depth, max_player, game, table=None, evaluator=None):
     if depth == 0 or position.winner() != None:
-        return position.evaluate(), position
-    
+        return (evaluator(position) if evaluator is not None else position.evaluate()), position
+
+    value, best_move = _simple_minimax(position, depth, max_player, table, 0, evaluator=evaluator)
+    return value, _play(position, best_move)
+
+def _simple_minimax(position, depth, max_player, table, ply, budget=None, evaluator=None, stats=None):
+    if budget is not None:
+        budget.tick()
+    if stats is not None:
+        stats.nodes += 1
+    analysis = position.analysis()
+    if depth == 0 or analysis.winner() != None:
+        if stats is not None:
+            return stats.evaluate(position, evaluator, position.evaluate), None
+        return (evaluator(position) if evaluator is not None else position.evaluate()), None
+
+    if table is not None:
+        key = position_key(position, max_player)
+        entry = table.probe(key)
+        if stats is not None:
+            stats.table_probes += 1
+            stats.table_hits += entry is not None
+        if entry is not None and ply > 0 and entry.depth >= depth and entry.bound == EXACT:
+            return entry.score, entry.move
+
     if max_player:
         maxEval = float('-inf')
         best_move = None
-        for move in get_all_moves(position, WHITE, game):
-            evaluation = simple_minimax(move, depth-1, False, game)[0]
+        for move in analysis.moves(WHITE):
+            position.make_move(move)
+            try:
+                evaluation = _simple_minimax(position, depth-1, False, table, ply+1, budget, evaluator, stats)[0]
+            finally:
+                position.unmake_move(move)
             maxEval = max(maxEval, evaluation)
             if maxEval == evaluation:
                 best_move = move
-        return maxEval, best_move
+        value = maxEval
     else:
         minEval = float('inf')
         best_move = None
-        for move in get_all_moves(position, RED, game):
-            evaluation = simple_minimax(move, depth-1, True, game)[0]
+        for move in analysis.moves(RED):
+            position.make_move(move)
+            try:
+                evaluation = _simple_minimax(position, depth-1, True, table, ply+1, budget, evaluator, stats)[0]
+            finally:
+                position.unmake_move(move)
             minEval = min(minEval, evaluation)
             if minEval == evaluation:
                 best_move = move
-        return minEval, best_move
+        value = minEval
+
+    if table is not None:
+        table.store(key, depth, EXACT, value, best_move)
+    return value, best_move
+
+#returns a copy of position with move played, the search itself never copies the board
+def _play(position, move):
+    if move is None:
+        return None
+    position.make_move(move)
+    new_position = deepcopy(position)
+    position.unmake_move(move)
+    return new_position
 
 def simulate_moves(piece, move, board, game, skip):
     board.move(piece, move[0], move[1]) #because it's a tuple
@@ -34,7 +83,10 @@ def simulate_moves(piece, move, board, game, skip):
         board.remove(skip)
     return board
 
+#one copy per child, kept for callers that want the resulting boards (the search uses make/unmake)
 def get_all_moves(board, color, game):
+    if isinstance(board, BitBoard):
+        return board.get_children(color)
     moves = []
     for piece in board.get_all_pieces(color):
         valid_moves = board.get_valid_moves(piece)
@@ -45,32 +97,204 @@ def get_all_moves(board, color, game):
             moves.append(new_board)
     return moves
 
+class SearchTimeout(Exception):
+    pass
+
+#wall clock / node limits for one search, _alpha_beta raises SearchTimeout once they are used up
+class SearchBudget:
+    CHECK_EVERY = 256   # nodes between two clock reads
+
+    def __init__(self, time_limit=None, node_limit=None):
+        self.deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self.node_limit = node_limit
+        self.nodes = 0
+
+        self.stopped = False
+
+    #can be called from another thread, the search notices it within CHECK_EVERY nodes
+    def stop(self):
+        self.stopped = True
+
+    def tick(self):
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchTimeout()
+        if self.nodes % self.CHECK_EVERY == 0 and \
+                (self.stopped or self.deadline is not None and time.perf_counter() > self.deadline):
+            raise SearchTimeout()
+
 # optimized with aplha beta pruning 
-def minimax_alpha_beta(position, depth, alpha, beta, max_player, game):
+# table: optional TranspositionTable, keep the same one across moves to reuse previous searches
+# ordering: optional MoveOrdering (minimax/ordering.py), without it only the table move goes first
+# batch: optional FrontierEvaluator (checkers/batch_eval.py), scores all the leaves under a depth 1 node in one call
+# tablebase: optional Tablebase (tablebase/probe.py), positions with few pieces get their exact score without search
+# evaluator: optional function(position) -> score replacing position.evaluate_22F at the leaves (batch only knows evaluate_22F)
+# quiescence: optional Quiescence (minimax/quiescence.py), the captures left at depth 0 are played out before scoring
+def minimax_alpha_beta(position, depth, alpha, beta, max_player, game, table=None, ordering=None, batch=None, tablebase=None,
+                       evaluator=None, quiescence=None):
     if depth == 0 or position.winner() != None:
-        return position.evaluate_22F(), position
-    
-    if max_player:
+        return (evaluator(position) if evaluator is not None else position.evaluate_22F()), position
+
+    value, best_move = _alpha_beta(position, depth, alpha, beta, max_player, table, 0, ordering=ordering, batch=batch,
+                                   tablebase=tablebase, evaluator=evaluator, quiescence=quiescence)
+    return value, _play(position, best_move)
+
+# principal variation search: minimax_alpha_beta where only the first move of a node gets the (alpha, beta) window,
+# the others are first searched with a null window just to prove they are not better, and searched again when one is
+def minimax_pvs(position, depth, alpha, beta, max_player, game, table=None, ordering=None, tablebase=None, evaluator=None,
+                quiescence=None):
+    if depth == 0 or position.winner() != None:
+        return (evaluator(position) if evaluator is not None else position.evaluate_22F()), position
+
+    value, best_move = _alpha_beta(position, depth, alpha, beta, max_player, table, 0, ordering=ordering, tablebase=tablebase,
+                                   evaluator=evaluator, quiescence=quiescence, pvs=True)
+    return value, _play(position, best_move)
+
+# width of the null windows of the principal variation search, below the smallest step of evaluate_22F
+NULL_WINDOW = 1e-3
+
+# stats: optional SearchStats (minimax/stats.py) counting nodes, leaves, cutoffs, evaluations and table probes
+def _alpha_beta(position, depth, alpha, beta, max_player, table, ply, budget=None, ordering=None, batch=None, tablebase=None,
+                evaluator=None, stats=None, quiescence=None, pvs=False):
+    if budget is not None:
+        budget.tick()
+    if stats is not None:
+        stats.nodes += 1
+    #legal moves and game over status of this node, shared with the evaluation and kept through re-searches
+    analysis = position.analysis()
+    if depth == 0 and quiescence is not None and analysis.winner() == None:
+        return quiescence.search(position, alpha, beta, max_player, evaluator, stats), None
+    if depth == 0 or analysis.winner() != None:
+        if stats is not None:
+            return stats.evaluate(position, evaluator, position.evaluate_22F), None
+        return (evaluator(position) if evaluator is not None else position.evaluate_22F()), None
+    #the root still needs its move, below it a known endgame is not searched
+    if tablebase is not None and ply > 0:
+        score = tablebase.score(position, max_player)
+        if score is not None:
+            if stats is not None:
+                stats.leaves += 1
+            return score, None
+
+    hash_move = None
+    if table is not None:
+        key = position_key(position, max_player)
+        entry = table.probe(key)
+        if stats is not None:
+            stats.table_probes += 1
+            stats.table_hits += entry is not None
+        if entry is not None:
+            hash_move = entry.move
+        #never cut at the root, the caller needs a move that belongs to this position
+        if entry is not None and ply > 0 and entry.depth >= depth:
+            if entry.bound == EXACT:
+                return entry.score, entry.move
+            elif entry.bound == LOWER:
+                alpha = max(alpha, entry.score)
+            else:
+                beta = min(beta, entry.score)
+            if beta <= alpha:
+                return entry.score, entry.move
+        alpha_start, beta_start = alpha, beta
+
+    moves = analysis.moves(WHITE if max_player else RED)
+    if ordering is not None:
+        moves = ordering.order(position, moves, ply, hash_move)
+    else:
+        moves = _hash_move_first(moves, hash_move)
+
+    #only a strictly better move replaces the best one: after a cutoff in the subtree a child
+    #returns a bound, and a bound equal to the best value is not a move as good as the best
+    if depth == 1 and batch is not None and quiescence is None and moves:
+        #every child is a leaf: no pruning to lose, score them all at once
+        value = float('-inf') if max_player else float('inf')
+        best_move = None
+        start = time.perf_counter() if stats is not None else None
+        evaluations = batch.evaluate_children(position, moves)
+        if stats is not None:
+            stats.nodes += len(moves)
+            stats.leaves += len(moves)
+            stats.eval_calls += len(moves)
+            stats.eval_time += time.perf_counter() - start
+        for move, evaluation in zip(moves, evaluations):
+            if best_move is None or (evaluation > value if max_player else evaluation < value):
+                value = evaluation
+                best_move = move
+    elif max_player:
         maxEval = float('-inf')
         best_move = None
-        for move in get_all_moves(position, WHITE, game):
-            evaluation = minimax_alpha_beta(move, depth-1, alpha, beta, False, game)[0]
-            maxEval = max(maxEval, evaluation)
-            if maxEval == evaluation:
+        for index, move in enumerate(moves):
+            position.make_move(move)
+            try:
+                if pvs and index > 0:
+                    evaluation = _alpha_beta(position, depth-1, alpha, alpha + NULL_WINDOW, False, table, ply+1, budget,
+                                             ordering, batch, tablebase, evaluator, stats, quiescence, True)[0]
+                    #failed high: better than the first move, its real score is needed
+                    if alpha < evaluation < beta:
+                        if stats is not None:
+                            stats.researches += 1
+                        evaluation = _alpha_beta(position, depth-1, alpha, beta, False, table, ply+1, budget,
+                                                 ordering, batch, tablebase, evaluator, stats, quiescence, True)[0]
+                else:
+                    evaluation = _alpha_beta(position, depth-1, alpha, beta, False, table, ply+1, budget, ordering, batch,
+                                             tablebase, evaluator, stats, quiescence, pvs)[0]
+            finally:
+                position.unmake_move(move)
+            if best_move is None or evaluation > maxEval:
+                maxEval = evaluation
                 best_move = move
             alpha = max(alpha, evaluation)
             if beta <= alpha:
+                if ordering is not None:
+                    ordering.record_cutoff(position, move, ply, depth, index)
+                if stats is not None:
+                    stats.cutoffs += 1
                 break
-        return maxEval, best_move
+        value = maxEval
     else:
         minEval = float('inf')
         best_move = None
-        for move in get_all_moves(position, RED, game):
-            evaluation = minimax_alpha_beta(move, depth-1, alpha, beta, True, game)[0]
-            minEval = min(minEval, evaluation)
-            if minEval == evaluation:
+        for index, move in enumerate(moves):
+            position.make_move(move)
+            try:
+                if pvs and index > 0:
+                    evaluation = _alpha_beta(position, depth-1, beta - NULL_WINDOW, beta, True, table, ply+1, budget,
+                                             ordering, batch, tablebase, evaluator, stats, quiescence, True)[0]
+                    if alpha < evaluation < beta:
+                        if stats is not None:
+                            stats.researches += 1
+                        evaluation = _alpha_beta(position, depth-1, alpha, beta, True, table, ply+1, budget,
+                                                 ordering, batch, tablebase, evaluator, stats, quiescence, True)[0]
+                else:
+                    evaluation = _alpha_beta(position, depth-1, alpha, beta, True, table, ply+1, budget, ordering, batch,
+                                             tablebase, evaluator, stats, quiescence, pvs)[0]
+            finally:
+                position.unmake_move(move)
+            if best_move is None or evaluation < minEval:
+                minEval = evaluation
                 best_move = move
             beta = min(beta, evaluation)
             if beta <= alpha:
+                if ordering is not None:
+                    ordering.record_cutoff(position, move, ply, depth, index)
+                if stats is not None:
+                    stats.cutoffs += 1
                 break
-        return minEval, best_move
+        value = minEval
+
+    if table is not None:
+        if value <= alpha_start:
+            bound = UPPER
+        elif value >= beta_start:
+            bound = LOWER
+        else:
+            bound = EXACT
+        table.store(key, depth, bound, value, best_move)
+    return value, best_move
+
+#the best move of an earlier (shallower) search of this position goes first, it is the likeliest cutoff
+def _hash_move_first(moves, hash_move):
+    if hash_move is not None and hash_move in moves:
+        #move the generated one, the stored move may come from another copy of the board
+        moves.insert(0, moves.pop(moves.index(hash_move)))
+    return moves
@@ -0,0 +1,131 @@
+import time
+from checkers.zobrist import position_key
+from .algorithm import _alpha_beta, _simple_minimax, _play, SearchBudget, SearchTimeout, WHITE, RED
+from .transposition import TranspositionTable
+from .ordering import MoveOrdering
+from .stats import principal_variation
+
+# aspiration windows of the principal variation search: the first window is the previous iteration's
+# value +- ASPIRATION_WINDOW, a value on or past an edge widens that side ASPIRATION_GROWTH times,
+# after ASPIRATION_TRIES failures the window is opened completely
+ASPIRATION_WINDOW = 0.5
+ASPIRATION_GROWTH = 4
+ASPIRATION_TRIES = 3
+
+def _search(search, position, depth, max_player, table, budget, ordering, tablebase, evaluator, stats, quiescence,
+            previous=None):
+    if search == 'simple_minimax':
+        return _simple_minimax(position, depth, max_player, table, 0, budget, evaluator, stats)
+    if search == 'pvs' and previous is not None:
+        return _aspiration(position, depth, max_player, table, budget, ordering, tablebase, evaluator, stats, quiescence,
+                           previous)
+    return _alpha_beta(position, depth, float('-inf'), float('inf'), max_player, table, 0, budget, ordering,
+                       tablebase=tablebase, evaluator=evaluator, stats=stats, quiescence=quiescence, pvs=search == 'pvs')
+
+def _aspiration(position, depth, max_player, table, budget, ordering, tablebase, evaluator, stats, quiescence, previous):
+    # principal variation search in a window around the previous value, widened until the value falls inside
+    below = above = ASPIRATION_WINDOW
+    for attempt in range(ASPIRATION_TRIES + 1):
+        alpha = previous - below if attempt < ASPIRATION_TRIES else float('-inf')
+        beta = previous + above if attempt < ASPIRATION_TRIES else float('inf')
+        value, best_move = _alpha_beta(position, depth, alpha, beta, max_player, table, 0, budget, ordering,
+                                       tablebase=tablebase, evaluator=evaluator, stats=stats, quiescence=quiescence, pvs=True)
+        if alpha < value < beta:
+            break
+        if stats is not None:
+            stats.aspiration_failures += 1
+        #only the side that failed is widened, the value is known to be on that side
+        if value <= alpha:
+            below *= ASPIRATION_GROWTH
+        else:
+            above *= ASPIRATION_GROWTH
+    return value, best_move
+
+def _iteration(stats, depth, nodes, start, value):
+    # per depth line of the stats
+    if stats is not None:
+        stats.depths.append({'depth': depth, 'nodes': nodes, 'seconds': time.perf_counter() - start, 'value': value})
+
+def iterative_search(position, max_player, time_limit=None, node_limit=None, max_depth=64, table=None, ordering=None, budget=None,
+                     tablebase=None, evaluator=None, search=None, stats=None, quiescence=None):
+    """
+    Searches depth 1, 2, 3, ... with minimax alpha beta until the time or node budget runs out.
+
+    Every iteration stores its best moves in the transposition table, the next one searches
+    them first so most of the previous work is reused. An interrupted iteration is thrown
+    away: the result is always the one of the deepest completed search.
+
+    Args:
+    - position: Board or BitBoard, left unchanged.
+    - max_player: True when WHITE is to move.
+    - time_limit: seconds, None for no clock.
+    - node_limit: nodes, None for no limit.
+    - max_depth: deepest iteration.
+    - table: TranspositionTable to use (and keep warm), a new one if None.
+    - ordering: MoveOrdering to use, a new one (hash move, captures, promotions, killers, history) if None.
+    - budget: SearchBudget to use instead of time_limit/node_limit, keep a reference to stop() the search.
+    - tablebase: Tablebase scoring the endgames it holds without searching them.
+    - evaluator: function(position) -> score used at the leaves instead of evaluate_22F.
+    - search: None for alpha beta, 'simple_minimax' for the plain minimax (no window, no ordering, no tablebase),
+      'pvs' for the principal variation search, every iteration in an aspiration window around the previous value.
+    - stats: SearchStats (minimax/stats.py) to fill in, the search runs a little slower with it.
+    - quiescence: Quiescence (minimax/quiescence.py) playing out the captures at the horizon (alpha beta only).
+
+    Returns:
+    - (value, best_move, depth, nodes): best_move is None when the game is over, depth is 0 when the
+      budget ran out before depth 1 completed (best_move is then the first move in search order).
+    """
+    if table is None:
+        table = TranspositionTable()
+    if ordering is None:
+        ordering = MoveOrdering()
+    else:
+        ordering.new_search()
+    analysis = position.analysis()
+    if analysis.winner() != None:
+        return (evaluator(position) if evaluator is not None else position.evaluate_22F()), None, 0, 0
+
+    start = time.perf_counter()
+    if budget is None:
+        budget = SearchBudget(time_limit, node_limit)
+    try:
+        value, best_move = _search(search, position, 1, max_player, table, budget, ordering, tablebase, evaluator, stats,
+                                   quiescence)
+        _iteration(stats, 1, budget.nodes, start, value)
+        depth = 1
+    except SearchTimeout:
+        #stopped before depth 1 completed, there still has to be a move to play: the first one in search order
+        entry = table.probe(position_key(position, max_player))
+        moves = ordering.order(position, analysis.moves(WHITE if max_player else RED), 0,
+                               entry.move if entry is not None else None)
+        value = evaluator(position) if evaluator is not None else position.evaluate_22F()
+        best_move, depth = moves[0] if moves else None, 0
+    if depth and analysis.mobility(WHITE if max_player else RED) > 1:
+        for next_depth in range(2, max_depth + 1):
+            iteration_start, iteration_nodes = time.perf_counter(), budget.nodes
+            try:
+                value, best_move = _search(search, position, next_depth, max_player, table, budget, ordering, tablebase,
+                                           evaluator, stats, quiescence, value)
+            except SearchTimeout:
+                break
+            _iteration(stats, next_depth, budget.nodes - iteration_nodes, iteration_start, value)
+            depth = next_depth
+    nodes = budget.nodes
+
+    if stats is not None:
+        stats.move, stats.value, stats.depth = best_move, value, depth
+        stats.pv = principal_variation(position, max_player, table, depth)
+        stats.elapsed = time.perf_counter() - start
+    return value, best_move, depth, nodes
+
+def iterative_deepening(position, max_player, game=None, time_limit=None, node_limit=None, max_depth=64, table=None, ordering=None):
+    """
+    iterative_search returning the position after the best move, like minimax_alpha_beta.
+
+    Returns:
+    - (value, new_position, depth): value and position after the best move, depth of the search that found it.
+    """
+    value, best_move, depth, _ = iterative_search(position, max_player, time_limit, node_limit, max_depth, table, ordering)
+    if best_move is None and depth == 0:
+        return value, position, depth
+    return value, _play(position, best_move), depth
@@ -0,0 +1,92 @@
+from checkers.bitboard import BitBoard, PROMOTION_ROWS
+
+# sort keys, higher goes first. History scores stay below the killer bonus.
+HASH_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 24     # plus CAPTURED_PIECE_SCORE per piece taken, multi jumps first
+CAPTURED_PIECE_SCORE = 1 << 20
+PROMOTION_SCORE = 1 << 19
+KILLER_SCORES = (1 << 18, 1 << 17)
+HISTORY_CAP = (1 << 17) - 1
+
+def describe(position, move):
+    """(from square, to square, pieces captured, promotes) for a Board Move or a BitBoard move tuple."""
+    if isinstance(position, BitBoard):
+        origin, destination, captured = move
+        promotes = not position.kings >> origin & 1 and bool(PROMOTION_ROWS >> destination & 1)
+        return origin, destination, captured.bit_count(), promotes
+    row, col = move.start
+    end_row, end_col = move.end
+    piece = position.board[row][col]
+    promotes = not piece.king and (end_row == 0 or end_row == len(position.board) - 1)
+    return row * 4 + col // 2, end_row * 4 + end_col // 2, len(move.captured), promotes
+
+class MoveOrdering:
+    """
+    Orders the moves of a node before minimax_alpha_beta searches them:
+    hash move, captures (more pieces first), promotions, two killer moves per ply, then the rest by history.
+
+    Every part can be switched off, and a subclass can replace order/record_cutoff to try other schemes.
+    The same object should live for a whole search (or a game: killers and history carry over).
+    """
+
+    def __init__(self, hash_move=True, captures=True, promotions=True, killers=True, history=True):
+        self.use_hash_move = hash_move
+        self.use_captures = captures
+        self.use_promotions = promotions
+        self.use_killers = killers
+        self.use_history = history
+        self.killers = []
+        self.history = [0] * (32 * 32)
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def order(self, position, moves, ply, hash_move=None):
+        killers = self.killers[ply] if self.use_killers and ply < len(self.killers) else ()
+        scored = []
+        for move in moves:
+            origin, destination, captured, promotes = describe(position, move)
+            if self.use_hash_move and hash_move is not None and move == hash_move:
+                score = HASH_MOVE_SCORE
+            elif captured and self.use_captures:
+                score = CAPTURE_SCORE + captured * CAPTURED_PIECE_SCORE
+            elif promotes and self.use_promotions:
+                score = PROMOTION_SCORE
+            elif killers and move == killers[0]:
+                score = KILLER_SCORES[0]
+            elif killers and move == killers[1]:
+                score = KILLER_SCORES[1]
+            elif self.use_history:
+                score = min(self.history[origin * 32 + destination], HISTORY_CAP)
+            else:
+                score = 0
+            scored.append((score, move))
+        #stable sort: equal scores keep the generation order
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [move for _, move in scored]
+
+    def record_cutoff(self, position, move, ply, depth, index):
+        """Called by the search when `move`, the index-th move searched, caused a beta cutoff."""
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        origin, destination, captured, _ = describe(position, move)
+        if captured:
+            return
+        if self.use_killers:
+            while len(self.killers) <= ply:
+                self.killers.append([None, None])
+            slots = self.killers[ply]
+            if move != slots[0]:
+                slots[1] = slots[0]
+                slots[0] = move
+        if self.use_history:
+            self.history[origin * 32 + destination] += depth * depth
+
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def new_search(self):
+        #killers are ply-relative to the old root, history is only aged
+        self.killers = []
+        self.history = [score // 2 for score in self.history]
+        self.cutoffs = self.first_move_cutoffs = 0
@@ -0,0 +1,129 @@
+"""Root splitting search on a process pool, every root move is a task."""
+
+import multiprocessing
+import time
+from checkers.board import Board
+from checkers.bitboard import BitBoard, to_board_move, from_board_move
+from .algorithm import _alpha_beta, _play, minimax_alpha_beta, WHITE, RED
+from .ordering import MoveOrdering
+from .transposition import TranspositionTable
+
+# per worker process state, set by _init_worker
+_shared_best = None
+_table = None
+_ordering = None
+
+def _init_worker(shared_best, table_bytes):
+    global _shared_best, _table, _ordering
+    _shared_best = shared_best
+    _table = TranspositionTable(table_bytes)
+    _ordering = MoveOrdering()
+
+def _search_root_move(task):
+    masks, move, depth, max_player, deterministic = task
+    position = BitBoard(*masks)
+    position.make_move(move)
+    if deterministic:
+        alpha, beta = float('-inf'), float('inf')
+        table, ordering = None, MoveOrdering()
+    else:
+        best = _shared_best.value
+        alpha, beta = (best, float('inf')) if max_player else (float('-inf'), best)
+        table, ordering = _table, _ordering
+    value = _alpha_beta(position, depth - 1, alpha, beta, not max_player, table, 1, ordering=ordering)[0]
+    #a result on the wrong side of the starting bound only says "no better than the best so far",
+    #with the full window there is no such side: a forced loss (+-inf) is still the move's value
+    full_window = alpha == float('-inf') and beta == float('inf')
+    exact = full_window or (value > alpha if max_player else value < beta)
+    if not deterministic and exact:
+        with _shared_best.get_lock():
+            if max_player and value > _shared_best.value or not max_player and value < _shared_best.value:
+                _shared_best.value = value
+    return value, exact
+
+def _root_moves(position, bitboard, max_player, ordered):
+    """Root moves as BitBoard move tuples, in the order of position.get_all_moves (or ordered for speed)."""
+    color = WHITE if max_player else RED
+    if isinstance(position, Board):
+        moves = [from_board_move(move) for move in position.get_all_moves(color)]
+    else:
+        moves = bitboard.get_all_moves(color)
+    if ordered:
+        moves = MoveOrdering().order(bitboard, moves, 0)
+    return moves
+
+class ParallelSearch:
+    """
+    Process pool running root split alpha beta searches. Keep one around: the workers,
+    their tables and their move ordering survive between searches.
+
+    Args:
+    - workers: number of processes.
+    - deterministic: full window and fresh state for every root move (same move as the serial search).
+    - table_bytes: transposition table size of each worker.
+    """
+
+    def __init__(self, workers=4, deterministic=False, table_bytes=16 * 1024 * 1024):
+        self.workers = workers
+        self.deterministic = deterministic
+        self.shared_best = multiprocessing.Value('d', 0.0)
+        self.pool = multiprocessing.Pool(workers, _init_worker, (self.shared_best, table_bytes))
+
+    def search(self, position, depth, max_player):
+        """Same arguments and result as minimax_alpha_beta: (value, position after the best move)."""
+        if depth == 0 or position.winner() != None:
+            return position.evaluate_22F(), position
+        bitboard = position if isinstance(position, BitBoard) else BitBoard.from_board(position)
+        moves = _root_moves(position, bitboard, max_player, not self.deterministic)
+        if not moves:
+            return (float('-inf') if max_player else float('inf')), None
+
+        self.shared_best.value = float('-inf') if max_player else float('inf')
+        masks = (bitboard.white, bitboard.red, bitboard.kings)
+        tasks = [(masks, move, depth, max_player, self.deterministic) for move in moves]
+        results = self.pool.map(_search_root_move, tasks, chunksize=1)
+
+        best_value, best_move = None, None
+        for move, (value, exact) in zip(moves, results):
+            if not exact:
+                continue
+            if best_move is None or (value > best_value if max_player else value < best_value):
+                best_value, best_move = value, move
+        #like the serial search, the first root move when none is better than another
+        if best_move is None:
+            best_value, best_move = results[0][0], moves[0]
+        if isinstance(position, Board):
+            best_move = to_board_move(position, best_move, WHITE if max_player else RED)
+        return best_value, _play(position, best_move)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def benchmark(position=None, depth=6, max_player=True, worker_counts=(1, 2, 4, 8)):
+    """Times the serial search and the parallel one with each worker count, prints and returns the speedups."""
+    if position is None:
+        position = BitBoard.initial()
+    start = time.perf_counter()
+    serial_value, _ = minimax_alpha_beta(position, depth, float('-inf'), float('inf'), max_player, None,
+                                         TranspositionTable(), MoveOrdering())
+    serial_time = time.perf_counter() - start
+    print("serial: %.3f s value %s" % (serial_time, serial_value))
+    report = {}
+    for workers in worker_counts:
+        with ParallelSearch(workers) as search:
+            start = time.perf_counter()
+            value, _ = search.search(position, depth, max_player)
+            elapsed = time.perf_counter() - start
+        report[workers] = serial_time / elapsed
+        print("%d workers: %.3f s value %s speedup %.2fx" % (workers, elapsed, value, report[workers]))
+    return report
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,63 @@
+from checkers.constants import RED, WHITE
+from .ordering import describe
+
+DEFAULT_NODE_LIMIT = 64
+
+class Quiescence:
+    """
+    Plays out the captures left at the horizon of minimax_alpha_beta before the position is scored.
+
+    A leaf in the middle of an exchange is scored after it, not before the recapture. Captures
+    are not forced, so the side to move may also stop ("stand pat") with the static score.
+    Only captures are searched, the most pieces taken first.
+
+    Args:
+    - node_limit: nodes one horizon position may spend on its captures. Past it the static
+      score is returned, a long capture fight cannot eat the search.
+    """
+
+    def __init__(self, node_limit=DEFAULT_NODE_LIMIT):
+        self.node_limit = node_limit
+        self.nodes = 0      # capture positions searched past the horizon since the object was made
+        self.left = 0       # nodes left for the current horizon position
+
+    def search(self, position, alpha, beta, max_player, evaluator=None, stats=None):
+        """Score of a horizon position (depth 0 of _alpha_beta), its captures played out within node_limit."""
+        self.left = self.node_limit
+        return self._search(position, alpha, beta, max_player, evaluator, stats)
+
+    def _search(self, position, alpha, beta, max_player, evaluator, stats):
+        if stats is not None:
+            stand = stats.evaluate(position, evaluator, position.evaluate_22F)
+        else:
+            stand = evaluator(position) if evaluator is not None else position.evaluate_22F()
+        analysis = position.analysis()
+        if self.left <= 0 or analysis.winner() != None:
+            return stand
+        if max_player and stand >= beta or not max_player and stand <= alpha:
+            return stand
+        captures = analysis.captures(WHITE if max_player else RED)
+        if not captures:
+            return stand
+        captures.sort(key=lambda move: -describe(position, move)[2])
+
+        best = stand
+        for move in captures:
+            if max_player:
+                alpha = max(alpha, best)
+            else:
+                beta = min(beta, best)
+            self.nodes += 1
+            self.left -= 1
+            if stats is not None:
+                stats.quiescence_nodes += 1
+            position.make_move(move)
+            try:
+                score = self._search(position, alpha, beta, not max_player, evaluator, stats)
+            finally:
+                position.unmake_move(move)
+            if max_player and score > best or not max_player and score < best:
+                best = score
+            if (best >= beta if max_player else best <= alpha) or self.left <= 0:
+                break
+        return best
@@ -0,0 +1,115 @@
+import json
+import time
+from checkers.zobrist import position_key
+from checkers.notation import move_to_text
+from .algorithm import WHITE, RED
+
+class SearchStats:
+    """
+    What one search did, filled in by _alpha_beta/_simple_minimax and iterative_search when passed to them.
+
+    Counters (whole search, interrupted iteration included):
+    - nodes, leaves: positions visited, positions scored without searching their moves
+    - quiescence_nodes: positions searched past the horizon by the capture search
+    - cutoffs: beta cutoffs
+    - researches, aspiration_failures: principal variation search only, null window searches that failed
+      high and were searched again, iterations searched again in a wider aspiration window
+    - eval_calls, eval_time: calls of the evaluator and seconds spent in it
+    - table_probes, table_hits: transposition table lookups and the ones that found the position
+
+    Filled in by iterative_search:
+    - depths: one dict per completed iteration (depth, nodes, seconds, value)
+    - pv: principal variation of the deepest iteration, read back from the table
+    - move, value, depth, elapsed: result of the search
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.leaves = 0
+        self.quiescence_nodes = 0
+        self.cutoffs = 0
+        self.researches = 0
+        self.aspiration_failures = 0
+        self.eval_calls = 0
+        self.eval_time = 0.0
+        self.table_probes = 0
+        self.table_hits = 0
+        self.depths = []
+        self.pv = []
+        self.move = None
+        self.value = None
+        self.depth = 0
+        self.elapsed = 0.0
+
+    def evaluate(self, position, evaluator, default):
+        #a leaf: timed call of evaluator(position), or of the bound method default() when there is no evaluator
+        self.leaves += 1
+        self.eval_calls += 1
+        start = time.perf_counter()
+        value = evaluator(position) if evaluator is not None else default()
+        self.eval_time += time.perf_counter() - start
+        return value
+
+    def branching_factor(self):
+        """Effective branching factor: nodes of the deepest iteration ** (1 / depth), 0 before the first one."""
+        if not self.depths:
+            return 0.0
+        last = self.depths[-1]
+        return last['nodes'] ** (1.0 / last['depth']) if last['depth'] else 0.0
+
+    def table_hit_rate(self):
+        return self.table_hits / self.table_probes if self.table_probes else 0.0
+
+    def to_dict(self):
+        return {
+            'move': move_to_text(self.move) if self.move is not None else None,
+            'value': self.value,
+            'depth': self.depth,
+            'elapsed': self.elapsed,
+            'nodes': self.nodes,
+            'leaves': self.leaves,
+            'quiescence_nodes': self.quiescence_nodes,
+            'cutoffs': self.cutoffs,
+            'researches': self.researches,
+            'aspiration_failures': self.aspiration_failures,
+            'branching_factor': self.branching_factor(),
+            'eval_calls': self.eval_calls,
+            'eval_time': self.eval_time,
+            'table_probes': self.table_probes,
+            'table_hits': self.table_hits,
+            'depths': self.depths,
+            'pv': [move_to_text(move) for move in self.pv],
+        }
+
+    def write(self, file):
+        """Appends the stats as one JSON line to the open text `file`."""
+        file.write(json.dumps(self.to_dict()) + '\n')
+
+    def __repr__(self):
+        return 'SearchStats(depth=%d, nodes=%d, leaves=%d, cutoffs=%d, ebf=%.2f, eval=%.3f s, pv=%s)' % (
+            self.depth, self.nodes, self.leaves, self.cutoffs, self.branching_factor(), self.eval_time,
+            ' '.join(move_to_text(move) for move in self.pv))
+
+def principal_variation(position, max_player, table, depth):
+    """
+    Moves expected from `position`, following the best moves stored in `table` for at most `depth` plies.
+
+    Reading the table counts as probes in its hit/miss counters, read them before.
+    """
+    pv, played = [], []
+    for _ in range(depth):
+        entry = table.probe(position_key(position, max_player))
+        analysis = position.analysis()
+        if entry is None or entry.move is None or analysis.winner() != None:
+            break
+        moves = analysis.moves(WHITE if max_player else RED)
+        if entry.move not in moves:
+            break
+        move = moves[moves.index(entry.move)]
+        position.make_move(move)
+        played.append(move)
+        pv.append(move)
+        max_player = not max_player
+    for move in reversed(played):
+        position.unmake_move(move)
+    return pv
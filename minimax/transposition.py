@@ -0,0 +1,68 @@
+from collections import namedtuple
+
+# bound types: EXACT is a real minimax value, LOWER means value >= score (beta cutoff),
+# UPPER means value <= score (nothing beat alpha)
+EXACT, LOWER, UPPER = 0, 1, 2
+
+Entry = namedtuple('Entry', ['key', 'depth', 'bound', 'score', 'move'])
+
+# rough size of one stored entry in CPython (the tuple, the 64 bit key, the float score and the slot)
+ENTRY_BYTES = 160
+
+class TranspositionTable:
+    """
+    Fixed size table of searched positions, indexed by Zobrist key.
+
+    Every bucket has two slots: the first keeps the deepest search seen for that bucket,
+    the second is always overwritten and takes the entry the first one gives up. Deep results
+    survive while recent shallow ones still get stored.
+
+    Args:
+    - max_bytes: memory cap, the number of buckets is derived from it.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.buckets = max(1, max_bytes // (2 * ENTRY_BYTES))
+        self.slots = [None] * (2 * self.buckets)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def probe(self, key):
+        index = 2 * (key % self.buckets)
+        entry = self.slots[index]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        entry = self.slots[index + 1]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, bound, score, move):
+        index = 2 * (key % self.buckets)
+        entry = Entry(key, depth, bound, score, move)
+        deepest = self.slots[index]
+        if deepest is None or deepest.key == key or depth >= deepest.depth:
+            #the deepest entry it replaces is still worth more than what the second slot holds
+            if deepest is not None and deepest.key != key:
+                self.slots[index + 1] = deepest
+            self.slots[index] = entry
+        else:
+            self.slots[index + 1] = entry
+        self.stores += 1
+
+    def clear(self):
+        self.slots = [None] * (2 * self.buckets)
+        self.hits = self.misses = self.stores = 0
+
+    def hit_rate(self):
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'stores': self.stores,
+                'hit_rate': self.hit_rate(), 'used': sum(1 for entry in self.slots if entry is not None),
+                'capacity': len(self.slots)}
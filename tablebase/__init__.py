@@ -0,0 +1 @@
+from .probe import Tablebase, WIN, LOSS, DRAW
@@ -0,0 +1,244 @@
+"""
+Retrograde generation of the endgame tablebase:
+
+    python -m tablebase.generator --pieces 4 --directory tablebase_files --workers 4
+"""
+
+import argparse
+import os
+import random
+import time
+from array import array
+from functools import partial
+from multiprocessing import Pool
+import numpy as np
+from checkers.constants import RED, WHITE
+from checkers.bitboard import BitBoard, SQUARES, ROW_MASKS
+from .indexing import Material, index, positions
+from .probe import Tablebase, HEADER, MAGIC, VERSION, WIN, LOSS, DRAW, WIN_BASE, LOSS_BASE, INVALID, MAX_DISTANCE, \
+    file_name, read_header
+
+UNKNOWN = 0
+
+def slices(max_pieces):
+    """Every material with at least one piece a side and at most `max_pieces` pieces."""
+    found = []
+    for pieces in range(2, max_pieces + 1):
+        for white in range(1, pieces):
+            for white_kings in range(white + 1):
+                for red_kings in range(pieces - white + 1):
+                    found.append(Material(white - white_kings, white_kings, pieces - white - red_kings, red_kings))
+    return found
+
+def waves(max_pieces):
+    """Slices grouped by (pieces, pawns), each group only depends on the groups before it."""
+    groups = {}
+    for material in slices(max_pieces):
+        groups.setdefault((material.pieces, material.pawns), []).append(material)
+    return [groups[key] for key in sorted(groups)]
+
+def ended(position):
+    """Winner of a position where a side has no movable piece, None if the game goes on."""
+    #is_winner of both colors at once
+    white_movable, red_movable, _, _ = position._movable()
+    if not white_movable:
+        return RED
+    if not red_movable:
+        return WHITE
+    return None
+
+def _gather(offsets, values, nodes):
+    # values[offsets[n]:offsets[n + 1]] for every n in nodes, concatenated
+    starts, ends = offsets[nodes], offsets[nodes + 1]
+    counts = ends - starts
+    total = int(counts.sum())
+    if not total:
+        return values[:0]
+    shifts = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+    return values[np.arange(total) + shifts]
+
+def _build(material, tablebase):
+    """Graph of a slice: results fixed before the search, the edges inside the slice and the pending outside results."""
+    size = material.size
+    result = np.full(2 * size, INVALID, dtype=np.int16)
+    distance = np.zeros(2 * size, dtype=np.int16)
+    children = np.zeros(2 * size, dtype=np.int32)
+    parents, targets = array('q'), array('q')
+    outside_wins = {}       # node -> shortest win through a move leaving the slice
+    outside_losses = []     # (level, node): a move leaving the slice into a win for the opponent
+    for at, white, red, kings in positions(material):
+        position = BitBoard(white, red, kings, 0)
+        winner = ended(position)
+        for side, color in ((0, RED), (1, WHITE)):
+            node = side * size + at
+            if winner is not None:
+                result[node] = WIN if winner == color else LOSS
+                continue
+            moves = position.get_all_moves(color)
+            if not moves:
+                result[node] = LOSS
+                continue
+            result[node] = UNKNOWN
+            children[node] = len(moves)
+            opponent = WHITE if color == RED else RED
+            for move in moves:
+                position.make_move(move)
+                child = Material.of(position)
+                if child == material:
+                    parents.append(node)
+                    targets.append((1 - side) * size + index(position, material))
+                else:
+                    #a side without pieces has no slice, the game is over
+                    over = ended(position) if not position.white or not position.red else None
+                    found = (WIN if over == opponent else LOSS, 0) if over is not None else \
+                        tablebase.probe(position, opponent)
+                    if found is None:
+                        raise ValueError("slice %s is missing for %s" % (child.name, material.name))
+                    if found[0] == LOSS:
+                        outside_wins[node] = min(outside_wins.get(node, MAX_DISTANCE + 1), found[1] + 1)
+                    elif found[0] == WIN:
+                        outside_losses.append((found[1] + 1, node))
+                position.unmake_move(move)
+    return result, distance, children, np.frombuffer(parents, dtype=np.int64), np.frombuffer(targets, dtype=np.int64), \
+        outside_wins, outside_losses
+
+def solve(material, tablebase):
+    """Table bytes of a slice (RED to move, then WHITE to move)."""
+    result, distance, children, parents, targets, outside_wins, outside_losses = _build(material, tablebase)
+
+    #parents of every node: edges sorted by target
+    order = np.argsort(targets, kind='stable')
+    by_target = parents[order]
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(targets, minlength=len(result))))).astype(np.int64)
+
+    wins_at, losses_at = {}, {}
+    for node, level in outside_wins.items():
+        wins_at.setdefault(level, []).append(node)
+    for level, node in outside_losses:
+        losses_at.setdefault(level, []).append(node)
+    last = max(list(wins_at) + list(losses_at) + [0])
+
+    new_wins = np.flatnonzero((result == WIN))
+    new_losses = np.flatnonzero((result == LOSS))
+    level = 0
+    while len(new_wins) or len(new_losses) or level < last:
+        level += 1
+        if level > MAX_DISTANCE:
+            raise ValueError("distances of %s do not fit in a byte" % material.name)
+        #a child lost by the opponent wins the parent, one ply later
+        won = _gather(offsets, by_target, new_losses)
+        if level in wins_at:
+            won = np.concatenate((won, np.array(wins_at[level], dtype=np.int64)))
+        won = np.unique(won)
+        won = won[result[won] == UNKNOWN]
+        #a parent whose children are all won by the opponent is lost when the last one is
+        decrements = _gather(offsets, by_target, new_wins)
+        if level in losses_at:
+            decrements = np.concatenate((decrements, np.array(losses_at[level], dtype=np.int64)))
+        decrements = decrements[result[decrements] == UNKNOWN]
+        np.subtract.at(children, decrements, 1)
+        lost = np.unique(decrements)
+        lost = lost[children[lost] == 0]
+
+        result[won], distance[won] = WIN, level
+        result[lost], distance[lost] = LOSS, level
+        new_wins, new_losses = won, lost
+
+    table = np.zeros(len(result), dtype=np.uint8)
+    table[result == WIN] = WIN_BASE + distance[result == WIN]
+    table[result == LOSS] = LOSS_BASE + distance[result == LOSS]
+    table[result == INVALID] = INVALID
+    return table
+
+def generate_slice(directory, material):
+    """Solves one slice into `directory` unless its file is already complete, returns (material, seconds)."""
+    path = os.path.join(directory, file_name(material))
+    if read_header(path) is not None:
+        return material, 0.0
+    start = time.perf_counter()
+    tablebase = Tablebase(directory)
+    table = solve(material, tablebase)
+    tablebase.close()
+    #written aside and renamed, a file with the final name is always complete
+    partial_path = path + '.part'
+    with open(partial_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, *material, material.size))
+        file.write(table.tobytes())
+    os.replace(partial_path, path)
+    return material, time.perf_counter() - start
+
+def generate(directory, max_pieces=4, workers=None):
+    """Generates every slice up to `max_pieces` pieces, `workers` processes per group of independent slices."""
+    os.makedirs(directory, exist_ok=True)
+    with Pool(workers) as pool:
+        for wave in waves(max_pieces):
+            for material, seconds in pool.imap_unordered(partial(generate_slice, directory), wave):
+                print("%s: %d positions, %.1f s" % (material.name, 2 * material.size, seconds))
+
+def check(directory, samples=2000, seed=0):
+    """
+    Compares random tablebase entries with one ply of play: a win must be one ply longer than the
+    shortest child lost by the opponent, a loss one ply longer than the longest child won by the
+    opponent when all of them are, a draw must have a drawn child and no lost one.
+    Prints and returns the number of entries that disagree.
+    """
+    tablebase = Tablebase(directory)
+    rng = random.Random(seed)
+    materials = slices(tablebase.max_pieces)
+    wrong = 0
+    for _ in range(samples):
+        material = rng.choice(materials)
+        white, red, kings = _sample(material, rng)
+        position, color = BitBoard(white, red, kings), rng.choice((RED, WHITE))
+        found = tablebase.probe(position, color)
+        winner = ended(position)
+        moves = position.get_all_moves(color) if winner is None else []
+        if winner is not None:
+            expected = (WIN if winner == color else LOSS, 0)
+        elif not moves:
+            expected = (LOSS, 0)
+        else:
+            opponent = WHITE if color == RED else RED
+            outcomes = []
+            for move in moves:
+                child = position.apply(move)
+                over = ended(child) if not child.white or not child.red else None
+                outcomes.append((WIN if over == opponent else LOSS, 0) if over is not None else tablebase.probe(child, opponent))
+            lost = [distance for result, distance in outcomes if result == LOSS]
+            if lost:
+                expected = (WIN, min(lost) + 1)
+            elif all(result == WIN for result, _ in outcomes):
+                expected = (LOSS, max(distance for _, distance in outcomes) + 1)
+            else:
+                expected = (DRAW, 0)
+        if found != expected:
+            wrong += 1
+            print("%s %s to move: table %s, one ply %s" % (position, color, found, expected))
+    print("%d of %d entries disagree" % (wrong, samples))
+    return wrong
+
+def _sample(material, rng):
+    # a random position of the slice, pawns off their promotion row
+    while True:
+        squares = rng.sample(range(SQUARES), material.pieces)
+        groups, at = [], 0
+        for count in material:
+            groups.append(sum(1 << square for square in squares[at:at + count]))
+            at += count
+        white_pawns, white_kings, red_pawns, red_kings = groups
+        if not (white_pawns & ROW_MASKS[-1] or red_pawns & ROW_MASKS[0]):
+            return white_pawns | white_kings, red_pawns | red_kings, white_kings | red_kings
+
+def main():
+    parser = argparse.ArgumentParser(description="Generates the endgame tablebase.")
+    parser.add_argument('--pieces', type=int, default=4, help="largest number of pieces on the board")
+    parser.add_argument('--directory', default='tablebase_files')
+    parser.add_argument('--workers', type=int, default=None, help="processes, one per CPU by default")
+    parser.add_argument('--check', action='store_true', help="check random entries against one ply of play")
+    args = parser.parse_args()
+    generate(args.directory, args.pieces, args.workers)
+    if args.check:
+        check(args.directory)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Perfect index of the positions of a material slice (white pawns, white kings, red pawns, red kings)."""
+
+from collections import namedtuple
+from itertools import combinations, product
+from checkers.bitboard import SQUARES, ROW_MASKS, iter_bits
+
+PAWN_SQUARES = 28
+WHITE_PAWN_OFFSET, RED_PAWN_OFFSET = 0, 4
+
+# BINOM[n][k] = C(n, k), 0 when k > n
+BINOM = [[0] * (SQUARES + 1) for _ in range(SQUARES + 1)]
+for n in range(SQUARES + 1):
+    BINOM[n][0] = 1
+    for k in range(1, n + 1):
+        BINOM[n][k] = BINOM[n - 1][k - 1] + BINOM[n - 1][k]
+
+class Material(namedtuple('Material', 'white_pawns white_kings red_pawns red_kings')):
+    __slots__ = ()
+
+    @classmethod
+    def of(cls, position):
+        """Material of a BitBoard."""
+        kings = position.kings
+        return cls((position.white & ~kings).bit_count(), (position.white & kings).bit_count(),
+                   (position.red & ~kings).bit_count(), (position.red & kings).bit_count())
+
+    @property
+    def pieces(self):
+        return sum(self)
+
+    @property
+    def pawns(self):
+        return self.white_pawns + self.red_pawns
+
+    @property
+    def size(self):
+        """Number of indexes for one side to move."""
+        return (BINOM[PAWN_SQUARES][self.white_pawns] * BINOM[SQUARES][self.white_kings]
+                * BINOM[PAWN_SQUARES][self.red_pawns] * BINOM[SQUARES][self.red_kings])
+
+    @property
+    def name(self):
+        return 'w%d%dr%d%d' % self
+
+_ranks = {}     # (bits, offset) -> rank, there are only a few thousand groups of up to 3 squares
+
+def rank(bits, offset=0):
+    """Colex rank of the squares in `bits` among the squares from `offset` on."""
+    found = _ranks.get((bits, offset))
+    if found is None:
+        found, i = 0, 1
+        for square in iter_bits(bits):
+            found += BINOM[square - offset][i]
+            i += 1
+        _ranks[(bits, offset)] = found
+    return found
+
+def index(position, material):
+    """Index of a BitBoard in its slice `material`, None if a pawn stands on its promotion row."""
+    kings = position.kings
+    white_pawns, red_pawns = position.white & ~kings, position.red & ~kings
+    if white_pawns & ROW_MASKS[-1] or red_pawns & ROW_MASKS[0]:
+        return None
+    index = rank(white_pawns, WHITE_PAWN_OFFSET)
+    index = index * BINOM[SQUARES][material.white_kings] + rank(position.white & kings)
+    index = index * BINOM[PAWN_SQUARES][material.red_pawns] + rank(red_pawns, RED_PAWN_OFFSET)
+    return index * BINOM[SQUARES][material.red_kings] + rank(position.red & kings)
+
+def _combinations(count, offset, squares):
+    # masks in colex order, the order of their rank
+    masks = []
+    for combination in sorted(combinations(range(squares), count), key=lambda c: c[::-1]):
+        bits = 0
+        for position in combination:
+            bits |= 1 << (position + offset)
+        masks.append(bits)
+    return masks
+
+def positions(material):
+    """Yields (index, white, red, kings) for every valid position of the slice, in index order."""
+    groups = product(_combinations(material.white_pawns, WHITE_PAWN_OFFSET, PAWN_SQUARES),
+                     _combinations(material.white_kings, 0, SQUARES),
+                     _combinations(material.red_pawns, RED_PAWN_OFFSET, PAWN_SQUARES),
+                     _combinations(material.red_kings, 0, SQUARES))
+    for index, (white_pawns, white_kings, red_pawns, red_kings) in enumerate(groups):
+        white, red = white_pawns | white_kings, red_pawns | red_kings
+        if white_pawns & white_kings or red_pawns & red_kings or white & red:
+            continue
+        yield index, white, red, white_kings | red_kings
@@ -0,0 +1,123 @@
+"""Reading the tablebase files written by tablebase.generator, memory mapped."""
+
+import mmap
+import os
+import struct
+from checkers.constants import RED, WHITE
+from checkers.bitboard import BitBoard
+from .indexing import Material, index
+
+MAGIC = b'CKTB'
+VERSION = 1
+HEADER = struct.Struct('<4sB4B3xQ')     # magic, version, material, size per side
+
+DRAW, WIN, LOSS = 0, 1, -1
+# after the header one byte per index with RED to move, then one per index with WHITE to move:
+# 0 draw, WIN_BASE + d won in d plies, LOSS_BASE + d lost in d plies, INVALID not a position
+WIN_BASE, LOSS_BASE, INVALID = 1, 128, 255
+MAX_DISTANCE = 126
+
+# search score of a won position, minus the distance so shorter wins are preferred: far above the
+# evaluate_22F of a game going on, below the one of a game over (its winning feature weighs 10000)
+TABLEBASE_WIN = 5000
+
+def file_name(material):
+    return material.name + '.tb'
+
+def decode(byte):
+    """(result, distance) of a table byte, from the side to move."""
+    if byte == 0:
+        return DRAW, 0
+    if byte < LOSS_BASE:
+        return WIN, byte - WIN_BASE
+    return LOSS, byte - LOSS_BASE
+
+def read_header(path):
+    """(Material, size) of a complete tablebase file, None if it is missing, partial or not one."""
+    try:
+        with open(path, 'rb') as file:
+            magic, version, *counts, size = HEADER.unpack(file.read(HEADER.size))
+            file.seek(0, os.SEEK_END)
+            length = file.tell()
+    except (OSError, struct.error):
+        return None
+    material = Material(*counts)
+    if magic != MAGIC or version != VERSION or size != material.size or length != HEADER.size + 2 * size:
+        return None
+    return material, size
+
+class Tablebase:
+    """
+    The slices found in `directory`, opened on first use.
+
+    Args:
+    - directory: where tablebase.generator wrote the files.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.max_pieces = 0
+        self.slices = {}        # Material -> (mmap, size), None once found missing
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name.endswith('.tb'):
+                    header = read_header(os.path.join(directory, name))
+                    if header is not None:
+                        self.max_pieces = max(self.max_pieces, header[0].pieces)
+        self.hits = 0
+
+    def _slice(self, material):
+        if material in self.slices:
+            return self.slices[material]
+        path = os.path.join(self.directory, file_name(material))
+        table = None
+        if read_header(path) is not None:
+            with open(path, 'rb') as file:
+                table = (mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ), material.size)
+        self.slices[material] = table
+        return table
+
+    def probe(self, position, color):
+        """
+        Result of `position` (BitBoard or Board) with `color` to move.
+
+        Returns:
+        - (result, distance): result WIN, LOSS or DRAW for `color`, distance in plies to the end of the game.
+          None when the position is not in the tablebase.
+        """
+        if not isinstance(position, BitBoard):
+            if position.white_left + position.red_left > self.max_pieces:
+                return None
+            position = BitBoard.from_board(position)
+        if (position.white | position.red).bit_count() > self.max_pieces:
+            return None
+        material = Material.of(position)
+        table = self._slice(material)
+        if table is None:
+            return None
+        data, size = table
+        at = index(position, material)
+        if at is None:
+            return None
+        byte = data[HEADER.size + (size if color == WHITE else 0) + at]
+        if byte == INVALID:
+            return None
+        return decode(byte)
+
+    def score(self, position, max_player):
+        """Search score (positive is good for WHITE) of `position` with WHITE to move if max_player, None if not in the tablebase."""
+        found = self.probe(position, WHITE if max_player else RED)
+        if found is None:
+            return None
+        self.hits += 1
+        result, distance = found
+        if result == DRAW:
+            return 0
+        score = TABLEBASE_WIN - distance if result == WIN else distance - TABLEBASE_WIN
+        return score if max_player else -score
+
+    def close(self):
+        for table in self.slices.values():
+            if table is not None:
+                table[0].close()
+        self.slices = {}